@@ -2,9 +2,14 @@
 Agent包
 """
 
-from .media_agent import graph
-
 __all__ = [
     "graph",
 ]
 
+
+def __getattr__(name):
+    # 🔥 延迟导入：只用到 classifier 等子模块时不必构建整个 Agent 图
+    if name == "graph":
+        from .media_agent import graph
+        return graph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -17,17 +17,53 @@
 
 import re
 import logging
-from typing import Optional, List, Dict, Any
-from dataclasses import dataclass, field
+from collections import defaultdict
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Tuple
+from dataclasses import dataclass
 
 from backend.agents.models.tmdb_mapping import TMDBMapping, EpisodeInfo
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# 所有集数规则都要求数字，不含数字的文件名可直接跳过
+_HAS_DIGIT_RE = re.compile(r'\d')
+
+# 可能干扰集数提取的编码信息
+_STRIP_CODEC_RE = re.compile(r'(?:[xh]26[45]|HEVC|AVC|Ma10p|10bit)', re.IGNORECASE)
+
+# 集数提取规则（按优先级排列）
+_EP_PATTERN_SOURCES = (
+    r'EP?\.?(\d{2,4})',           # EP01, E01, EP.01
+    r'(?<![xh])E(\d{2,4})',       # E01 但不匹配 x265
+    r'第(\d{1,4})[集话話]',        # 第01集
+    r'\[(\d{2,4})\]',             # [01]
+    r'[\.\s\-_](\d{2,4})[\.\s\-_\[]',  # .01. _01_
+    r'S\d+E(\d{2,4})',            # S01E01
+)
+_EP_PATTERNS = [re.compile(p, re.IGNORECASE) for p in _EP_PATTERN_SOURCES]
+
+# 所有规则合并成一个正则：一次扫描即可判断是否有任何规则命中
+_EP_ANY_RE = re.compile('|'.join(f'(?:{p})' for p in _EP_PATTERN_SOURCES), re.IGNORECASE)
+
+# 集数提取是纯函数，重复扫描时直接命中缓存
+_EP_CACHE_SIZE = 65536
+
+# 批量提取时拼接文件名用的分隔符（不会被上述任何规则匹配）
+_BATCH_SEP = '\0'
+
+# 视频/字幕匹配时从文件名末尾去掉的后缀（小写，不含 "."）：先去扩展名，再去语言标识
+BASE_NAME_EXT_SUFFIXES = frozenset({'srt', 'ass', 'ssa', 'sub', 'mkv', 'mp4', 'avi', 'wmv', 'flv', 'mov'})
+BASE_NAME_LANG_SUFFIXES = frozenset({
+    'chs', 'cht', 'chi', 'eng', 'jpn', 'jap', 'kor', 'und',
+    'sc', 'tc', 'scjp', 'tcjp', 'chtjp', 'chsjp',
+})
+
+
+@dataclass(slots=True)
 class ClassifyResult:
-    """分类结果"""
+    """分类结果（slots：大批量文件时省去每个实例的 __dict__）"""
     file_path: str
     file_name: str
     
@@ -44,10 +80,11 @@ class ClassifyResult:
     episode: int = 0  # TMDB episode_number
     output_name: str = ""  # SxxExx 格式
     
-    # 关联的字幕
-    subtitles: List[Dict] = field(default_factory=list)
+    # 关联的字幕（大多数结果没有字幕，None 表示尚未关联，避免每个结果都分配空列表）
+    subtitles: Optional[List[Dict]] = None
 
 
+@lru_cache(maxsize=_EP_CACHE_SIZE)
 def extract_episode_number(filename: str) -> int:
     """
     从文件名提取集数
@@ -60,21 +97,53 @@ def extract_episode_number(filename: str) -> int:
     Returns:
         提取的编号，0 表示无法提取
     """
+    # 不含数字（.nfo、封面图等）直接返回
+    if not _HAS_DIGIT_RE.search(filename):
+        return 0
+    
     # 先移除可能干扰的编码信息
-    clean_name = re.sub(r'[xh]26[45]', '', filename, flags=re.IGNORECASE)
-    clean_name = re.sub(r'HEVC|AVC|Ma10p|10bit', '', clean_name, flags=re.IGNORECASE)
-    
-    patterns = [
-        r'EP?\.?(\d{2,4})',           # EP01, E01, EP.01
-        r'(?<![xh])E(\d{2,4})',       # E01 但不匹配 x265
-        r'第(\d{1,4})[集话話]',        # 第01集
-        r'\[(\d{2,4})\]',             # [01]
-        r'[\.\s\-_](\d{2,4})[\.\s\-_\[]',  # .01. _01_
-        r'S\d+E(\d{2,4})',            # S01E01
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, clean_name, re.IGNORECASE)
+    clean_name = _STRIP_CODEC_RE.sub('', filename)
+    return _extract_from_clean_name(clean_name)
+
+
+def extract_episode_numbers_batch(filenames: List[str]) -> List[int]:
+    """
+    批量提取集数，结果与逐个调用 extract_episode_number 一致
+    
+    编码信息在拼接后的整串上一次清理（以 \\0 分隔，任何规则都不会跨越它），
+    省去逐个文件的正则调用。
+    
+    Args:
+        filenames: 文件名列表
+        
+    Returns:
+        与 filenames 一一对应的编号列表，0 表示无法提取
+    """
+    if not filenames:
+        return []
+    
+    joined = _BATCH_SEP.join(filenames)
+    if joined.count(_BATCH_SEP) != len(filenames) - 1:
+        # 文件名自身包含分隔符，退回逐个提取
+        return [extract_episode_number(name) for name in filenames]
+    
+    clean_names = _STRIP_CODEC_RE.sub('', joined).split(_BATCH_SEP)
+    return [_extract_from_clean_name(name) for name in clean_names]
+
+
+@lru_cache(maxsize=_EP_CACHE_SIZE)
+def _extract_from_clean_name(clean_name: str) -> int:
+    """从已移除编码信息的文件名提取集数"""
+    if not _HAS_DIGIT_RE.search(clean_name):
+        return 0
+    
+    # 任何规则都不命中时直接返回，避免逐条规则重复扫描
+    if not _EP_ANY_RE.search(clean_name):
+        return 0
+    
+    # 命中时仍按优先级逐条匹配，保持规则顺序语义
+    for pattern in _EP_PATTERNS:
+        match = pattern.search(clean_name)
         if match:
             ep = int(match.group(1))
             # 排除不合理的集数（如 1080, 720 等分辨率）
@@ -89,6 +158,7 @@ def classify_file(
     file_name: str,
     context: str,
     mapping: TMDBMapping,
+    number: Optional[int] = None,
 ) -> ClassifyResult:
     """
     分类单个文件
@@ -100,6 +170,7 @@ def classify_file(
         file_name: 文件名
         context: "cumulative" 或 "season_N"
         mapping: TMDB 映射表
+        number: 已提取的编号（批量提取时传入），None 时从文件名提取
         
     Returns:
         ClassifyResult
@@ -110,7 +181,8 @@ def classify_file(
     )
     
     # 1. 提取编号
-    number = extract_episode_number(file_name)
+    if number is None:
+        number = extract_episode_number(file_name)
     result.extracted_number = number
     
     if number == 0:
@@ -136,6 +208,38 @@ def classify_file(
     return result
 
 
+class _MappingMatcher:
+    """按声明顺序查找第一条命中的 mapping（匹配串预先 casefold，逐条子串判断）"""
+    
+    def __init__(self, mappings: List[Dict[str, Any]]):
+        # 规则的匹配串只需 casefold 一次（比 lower 更适合非 ASCII 文件名），
+        # 命中后要用的字段也提前取出：(path_pattern, file_pattern, (tmdb_id, context, media_type))
+        self.prepared = [
+            (
+                (m.get("path_pattern") or "").casefold(),
+                (m.get("file_pattern") or "").casefold(),
+                (m.get("tmdb_id", 0), m.get("context", "cumulative"), m.get("media_type", "tv")),
+            )
+            for m in mappings
+        ]
+    
+    def match(self, file_path: str, file_name: str) -> Optional[Tuple[int, str, str]]:
+        """返回命中 mapping 的 (tmdb_id, context, media_type)，未命中返回 None"""
+        file_path_folded = file_path.casefold()
+        file_name_folded = file_name.casefold()
+        
+        for path_pattern, file_pattern, target in self.prepared:
+            # 路径匹配
+            if path_pattern and path_pattern in file_path_folded:
+                return target
+            
+            # 文件名匹配
+            if file_pattern and file_pattern in file_name_folded:
+                return target
+        
+        return None
+
+
 def classify_files(
     files: List[Dict[str, Any]],
     mappings: List[Dict[str, Any]],
@@ -153,27 +257,17 @@ def classify_files(
         分类结果列表
     """
     results = []
+    append = results.append
+    match = _MappingMatcher(mappings).match
+    
+    file_names = [file.get("name", "") for file in files]
+    numbers = extract_episode_numbers_batch(file_names)
     
-    for file in files:
+    for file, file_name, number in zip(files, file_names, numbers):
         file_path = file.get("path", "")
-        file_name = file.get("name", "")
-        file_dir = file.get("directory", "")
         
         # 找到匹配的 mapping
-        matched_mapping = None
-        for m in mappings:
-            path_pattern = m.get("path_pattern", "")
-            file_pattern = m.get("file_pattern", "")
-            
-            # 路径匹配
-            if path_pattern and path_pattern.lower() in file_path.lower():
-                matched_mapping = m
-                break
-            
-            # 文件名匹配
-            if file_pattern and file_pattern.lower() in file_name.lower():
-                matched_mapping = m
-                break
+        matched_mapping = match(file_path, file_name)
         
         if matched_mapping is None:
             result = ClassifyResult(
@@ -182,12 +276,10 @@ def classify_files(
                 status="unmatched",
                 error_message="没有匹配的 mapping 规则",
             )
-            results.append(result)
+            append(result)
             continue
         
-        tmdb_id = matched_mapping.get("tmdb_id", 0)
-        context = matched_mapping.get("context", "cumulative")
-        media_type = matched_mapping.get("media_type", "tv")
+        tmdb_id, context, media_type = matched_mapping
         
         # 电影特殊处理
         if media_type == "movie":
@@ -198,7 +290,7 @@ def classify_files(
                 tmdb_id=tmdb_id,
                 output_name="",  # 电影不需要 SxxExx
             )
-            results.append(result)
+            append(result)
             continue
         
         # TV 分类
@@ -210,11 +302,11 @@ def classify_files(
                 status="error",
                 error_message=f"TMDB ID {tmdb_id} 的映射表不存在",
             )
-            results.append(result)
+            append(result)
             continue
         
-        result = classify_file(file_path, file_name, context, tmdb_mapping)
-        results.append(result)
+        result = classify_file(file_path, file_name, context, tmdb_mapping, number)
+        append(result)
     
     return results
 
@@ -234,12 +326,12 @@ def summarize_results(results: List[ClassifyResult]) -> Dict[str, Any]:
             "error_files": [results],
         }
     """
+    by_tmdb = defaultdict(lambda: {"seasons": defaultdict(list), "files": []})
     summary = {
         "total": len(results),
         "matched": 0,
         "unmatched": 0,
         "error": 0,
-        "by_tmdb": {},
         "unmatched_files": [],
         "error_files": [],
     }
@@ -248,16 +340,11 @@ def summarize_results(results: List[ClassifyResult]) -> Dict[str, Any]:
         if r.status == "matched":
             summary["matched"] += 1
             
-            tmdb_id = r.tmdb_id
-            if tmdb_id not in summary["by_tmdb"]:
-                summary["by_tmdb"][tmdb_id] = {"seasons": {}, "files": []}
-            
+            group = by_tmdb[r.tmdb_id]
             if r.season > 0:
-                if r.season not in summary["by_tmdb"][tmdb_id]["seasons"]:
-                    summary["by_tmdb"][tmdb_id]["seasons"][r.season] = []
-                summary["by_tmdb"][tmdb_id]["seasons"][r.season].append(r)
+                group["seasons"][r.season].append(r)
             else:
-                summary["by_tmdb"][tmdb_id]["files"].append(r)
+                group["files"].append(r)
                 
         elif r.status == "unmatched":
             summary["unmatched"] += 1
@@ -266,5 +353,10 @@ def summarize_results(results: List[ClassifyResult]) -> Dict[str, Any]:
             summary["error"] += 1
             summary["error_files"].append(r)
     
+    # 转回普通 dict，避免下游误触发 defaultdict 自动建键
+    summary["by_tmdb"] = {
+        tmdb_id: {"seasons": dict(group["seasons"]), "files": group["files"]}
+        for tmdb_id, group in by_tmdb.items()
+    }
+    
     return summary
-
@@ -40,7 +40,7 @@ def get_current_thread() -> str:
 # ============ 前端数据过滤 ============
 
 # 需要 emit 到前端的字段（白名单）
-FRONTEND_FIELDS = {
+FRONTEND_FIELDS = frozenset({
     # 配置（前端需要显示连接状态）
     "storage_config",
     "strm_target_config",
@@ -62,7 +62,7 @@ FRONTEND_FIELDS = {
     "messages",
     # CopilotKit 内部字段
     "copilotkit",
-}
+})
 
 
 def filter_for_frontend(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -78,7 +78,8 @@ def filter_for_frontend(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict: 只包含前端需要的字段
     """
-    return {k: v for k, v in state.items() if k in FRONTEND_FIELDS}
+    # 遍历白名单而不是整个 State，不触碰 scanned_files 等大字段
+    return {k: state[k] for k in FRONTEND_FIELDS if k in state}
 
 
 # ============ 兼容性别名（逐步废弃）============
@@ -11,17 +11,21 @@ WebDAV Media Rename Agent - 使用AG-UI LangGraph
 - utils/: 辅助函数（如 LLM 调用）
 """
 
+import os
+import json
+import hashlib
 import logging
-from typing import Dict, Any
-from langchain_core.messages import SystemMessage, ToolMessage, AIMessage
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+import orjson
+from langchain_core.messages import BaseMessage, SystemMessage, ToolMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import ChatOpenAI
 from langgraph.graph import END, StateGraph
-from langgraph.prebuilt import ToolNode
 from langgraph.checkpoint.memory import MemorySaver
 
-# CopilotKit 集成
-from copilotkit.langgraph import copilotkit_emit_state, copilotkit_customize_config
+# 🔥 ChatOpenAI / ToolNode / CopilotKit 较重，只在用到的函数内导入
 
 # 内部模块
 from backend.config import get_config
@@ -33,12 +37,74 @@ from backend.agents.tool_response import parse_tool_response
 
 logger = logging.getLogger(__name__)
 
+# 每次 chat_node 都重新加载工具模块（仅开发调试时通过环境变量开启）
+_HOT_RELOAD_TOOLS = os.getenv("MEDIA_AGENT_HOT_RELOAD") == "1"
+
 
 def _get_thread_id(config: RunnableConfig) -> str:
     """从 RunnableConfig 中提取 thread_id"""
     return config.get("configurable", {}).get("thread_id", "default")
 
 
+# 各线程最近一次 emit 到前端的状态摘要（LRU，只保留最近活跃的线程）：{thread_id: digest}
+_EMITTED_DIGEST_CACHE_SIZE = 256
+_last_emitted_digest: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+# 键排序：tool 节点合并出的 dict 和 filter_for_frontend 的 dict 键顺序可能不同
+_DIGEST_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def _digest_default(obj: Any) -> Any:
+    """摘要序列化的兜底：messages 里的 LangChain 消息只取区分内容的字段"""
+    if isinstance(obj, BaseMessage):
+        return [obj.id, obj.type, obj.content, getattr(obj, "tool_calls", None)]
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"无法序列化的类型: {type(obj).__name__}")
+
+
+def _state_digest(frontend_state: Dict[str, Any]) -> Optional[bytes]:
+    """计算前端状态的摘要；含无法序列化的值时返回 None（视为有变化）"""
+    try:
+        data = orjson.dumps(frontend_state, default=_digest_default, option=_DIGEST_OPTIONS)
+    except TypeError:
+        # orjson 不支持的类型（如超过 64 位的整数），交给标准库兜底
+        try:
+            data = json.dumps(
+                frontend_state, ensure_ascii=False, sort_keys=True, default=_digest_default
+            ).encode()
+        except (TypeError, ValueError):
+            return None
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+async def _emit_state_if_changed(config: RunnableConfig, frontend_state: Dict[str, Any]):
+    """
+    发送状态到前端，与该线程上次发送的内容相同时跳过
+    
+    工具节点结束时的 emit 和下一轮 chat_node 开始时的 emit 往往完全相同，
+    跳过可以省掉一次推送。
+    """
+    from copilotkit.langgraph import copilotkit_emit_state
+    
+    thread_id = _get_thread_id(config)
+    digest = _state_digest(frontend_state)
+    if digest is not None and _last_emitted_digest.get(thread_id) == digest:
+        _last_emitted_digest.move_to_end(thread_id)
+        logger.debug(f"📤 [emit] 状态未变化，跳过: thread_id={thread_id}")
+        return
+    
+    if digest is None:
+        _last_emitted_digest.pop(thread_id, None)
+    else:
+        _last_emitted_digest[thread_id] = digest
+        _last_emitted_digest.move_to_end(thread_id)
+        while len(_last_emitted_digest) > _EMITTED_DIGEST_CACHE_SIZE:
+            _last_emitted_digest.popitem(last=False)
+    await copilotkit_emit_state(config, frontend_state)
+
+
 # ============ 默认人设配置（备用） ============
 # 注意：人设数据的主要来源是前端主题配置（frontend/src/themes/{theme}/index.ts）
 # 这里只保留一个通用的默认人设，作为前端未同步时的备用
@@ -55,34 +121,8 @@ DEFAULT_PERSONA = {
 }
 
 
-def _build_system_prompt(persona: Dict[str, Any], connection_info: str, scanned_info: str) -> str:
-    """
-    根据人设配置构建系统提示词
-    
-    Args:
-        persona: 人设配置字典
-        connection_info: 当前连接状态描述
-        scanned_info: 已扫描文件数描述
-    
-    Returns:
-        完整的系统提示词
-    """
-    name = persona.get("name", "助手")
-    full_name = persona.get("fullName", name)
-    style = persona.get("style", "专业友好")
-    role_desc = persona.get("roleDescription", "智能影视资源管理专家")
-    emoji = persona.get("emoji", "")
-    success_phrases = persona.get("successPhrases", ["完成！"])
-    error_phrases = persona.get("errorPhrases", ["出错了，请检查。"])
-    greetings = persona.get("greetings", ["已连接。"])
-    
-    # 构建示例短语
-    success_example = success_phrases[0] if success_phrases else "完成！"
-    error_example = error_phrases[0] if error_phrases else "出错了。"
-    greeting_example = greetings[0] if greetings else "已连接。"
-    
-    # 构建角色设定部分
-    role_section = f"""你是「{full_name}」，{role_desc}。你同时也是智能影视资源管理专家，精通各种媒体文件命名规范。
+# 系统提示词模板：静态部分只构建一次，每轮只填充占位符
+_SYSTEM_PROMPT_TEMPLATE = """你是「{full_name}」，{role_desc}。你同时也是智能影视资源管理专家，精通各种媒体文件命名规范。
 
 ## 🎀 角色设定
 你的核心职责是**分析**资源结构，**理解**命名模式，**匹配** TMDB 数据。
@@ -92,17 +132,14 @@ def _build_system_prompt(persona: Dict[str, Any], connection_info: str, scanned_
 - 遇到问题时：「{error_example}」
 - 成功时：「{success_example}」
 - 称呼用户为「你」，保持亲切
-{f'- 适当使用 emoji 表达情感（{emoji}）' if emoji else '- 保持简洁，不使用过多 emoji'}
+{emoji_hint}
 - 保持专业的同时带有个人风格
 
 ### 回复示例
 - ✅ 连接成功：「{greeting_example}」
 - ❌ 连接失败：「{error_example}」
-- 📂 扫描完成：「扫描完成！发现了 XX 个视频文件。{' ' + emoji[0] if emoji else ''}」
-- 🎬 分类完成：「分类结果出来了，让我给你看看。{' ' + emoji[0] if emoji else ''}」"""
-    
-    # 工具和流程部分（保持不变）
-    tools_and_workflow = f"""
+- 📂 扫描完成：「扫描完成！发现了 XX 个视频文件。{emoji_suffix}」
+- 🎬 分类完成：「分类结果出来了，让我给你看看。{emoji_suffix}」
 **当前状态**: {connection_info} | 已扫描: {scanned_info}
 
 ## 🧠 核心设计：代码不判断，只查表
@@ -125,7 +162,7 @@ def _build_system_prompt(persona: Dict[str, Any], connection_info: str, scanned_
 - `get_tmdb_details(tmdb_id, media_type)` - 🔥 **必调！** 获取分季详情
 
 ### 分析和分类
-- `prepare_llm_classification(tmdb_ids_json)` - 🔥 **终极方案！** 准备 LLM 分类数据
+- `prepare_llm_classification(tmdb_ids_json, offset=0)` - 🔥 **终极方案！** 准备 LLM 分类数据（视频过多时按 offset 分批）
 - `generate_classification(classifications_csv)` - 🔥 生成最终分类结果（CSV 格式）
 - `analyze_and_classify_v2(mappings_json)` - 新架构分类（备选）
 - `analyze_and_classify(mappings_json)` - 旧版分类（兼容）
@@ -268,12 +305,65 @@ unmatched:file_index,reason
 - **确认优先**：展示分析结论，请用户确认
 - **用中文回复**，保持 {name} 的风格
 - **专业与个性并存**：技术内容准确，语气有特色"""
+
+
+def _build_system_prompt(persona: Dict[str, Any], connection_info: str, scanned_info: str) -> str:
+    """
+    根据人设配置构建系统提示词
+    
+    Args:
+        persona: 人设配置字典
+        connection_info: 当前连接状态描述
+        scanned_info: 已扫描文件数描述
     
-    return role_section + tools_and_workflow
+    Returns:
+        完整的系统提示词
+    """
+    name = persona.get("name", "助手")
+    emoji = persona.get("emoji", "")
+    success_phrases = persona.get("successPhrases", ["完成！"])
+    error_phrases = persona.get("errorPhrases", ["出错了，请检查。"])
+    greetings = persona.get("greetings", ["已连接。"])
+    
+    return _SYSTEM_PROMPT_TEMPLATE.format_map({
+        "name": name,
+        "full_name": persona.get("fullName", name),
+        "style": persona.get("style", "专业友好"),
+        "role_desc": persona.get("roleDescription", "智能影视资源管理专家"),
+        # 构建示例短语
+        "success_example": success_phrases[0] if success_phrases else "完成！",
+        "error_example": error_phrases[0] if error_phrases else "出错了。",
+        "greeting_example": greetings[0] if greetings else "已连接。",
+        "emoji_hint": f"- 适当使用 emoji 表达情感（{emoji}）" if emoji else "- 保持简洁，不使用过多 emoji",
+        "emoji_suffix": " " + emoji[0] if emoji else "",
+        "connection_info": connection_info,
+        "scanned_info": scanned_info,
+    })
 
 
 # ============ Agent 节点 ============
 
+@lru_cache(maxsize=4)
+def _get_model_with_tools(model: str, base_url: str, api_key: str, tools_id: int):
+    """
+    创建绑定工具的 LLM（按配置缓存）
+    
+    ChatOpenAI 构造和 bind_tools 生成工具 schema 都有不小的开销，
+    配置不变时跨轮次复用。tools_id 为 ALL_TOOLS 的 id，工具模块重载后自然失效。
+    """
+    from langchain_openai import ChatOpenAI
+    from backend.agents.tools import ALL_TOOLS
+    
+    model_instance = ChatOpenAI(
+        model=model,
+        base_url=base_url,
+        api_key=api_key,
+        temperature=0.7,
+        streaming=True,
+    )
+    return model_instance.bind_tools(ALL_TOOLS)
+
+
 async def chat_node(state: MediaAgentState, config: RunnableConfig):
     """
     Chat节点 - Agent的主逻辑
@@ -296,35 +386,38 @@ async def chat_node(state: MediaAgentState, config: RunnableConfig):
     
     # 2. 发送状态到前端（🔥 过滤大数据）
     frontend_state = filter_for_frontend(state)
-    await copilotkit_emit_state(config, frontend_state)
-    
-    # 3. 创建LLM
-    model = ChatOpenAI(
-        model=llm_config.llm.model,
-        base_url=llm_config.llm.base_url,
-        api_key=llm_config.llm.api_key,
-        temperature=0.7,
-        streaming=True,
-    )
-    
-    # 🔥 动态导入工具列表，确保使用最新的工具代码（支持热重载）
-    import importlib
-    import backend.agents.tools
-    importlib.reload(backend.agents.tools)
+    await _emit_state_if_changed(config, frontend_state)
+    
+    # 3. 创建LLM（绑定工具后的实例按配置缓存）
+    # 🔥 仅在开启热重载时重新加载工具模块（重新执行整个模块代价很高）
+    # 平时代码改动由 watchfiles 重启进程生效
+    if _HOT_RELOAD_TOOLS:
+        import importlib
+        import backend.agents.tools
+        importlib.reload(backend.agents.tools)
+        _get_model_with_tools.cache_clear()
     from backend.agents.tools import ALL_TOOLS
     
-    model_with_tools = model.bind_tools(ALL_TOOLS)
+    model_with_tools = _get_model_with_tools(
+        llm_config.llm.model,
+        llm_config.llm.base_url,
+        llm_config.llm.api_key,
+        id(ALL_TOOLS),
+    )
     
     # 4. 构建当前状态描述（直接从 state 读取）
     storage_config = state.get("storage_config", {})
-    scanned_files = state.get("scanned_files", [])
+    scanned_count = state.get("scanned_count")
+    if scanned_count is None:
+        # 兼容没有 scanned_count 的旧 Checkpoint
+        scanned_count = len(state.get("scanned_files") or [])
     
     connection_info = "未连接"
     if storage_config:
         service_type = storage_config.get('type', 'unknown')
         connection_info = f"已连接到 {storage_config.get('url', '未知')} ({service_type})"
     
-    scanned_info = f"{len(scanned_files)} 个文件"
+    scanned_info = f"{scanned_count} 个文件"
     
     # 5. 🔥 动态人设：从 state 读取前端传递的 persona，或使用默认值
     persona = state.get("persona", {})
@@ -343,6 +436,7 @@ async def chat_node(state: MediaAgentState, config: RunnableConfig):
     
     # 6. 配置 CopilotKit - 显式启用所有工具调用的 emit
     # 这样前端可以在工具执行时显示 loading 状态
+    from copilotkit.langgraph import copilotkit_customize_config
     config = copilotkit_customize_config(
         config,
         emit_tool_calls=True,  # 显式启用所有工具调用的 emit
@@ -448,6 +542,7 @@ async def tool_node_with_state_emit(state: MediaAgentState, config: RunnableConf
     # ============ 2. 执行工具 ============
     # 直接使用 ALL_TOOLS（由顶部导入）
     # 注意：热重载由 watchfiles 处理，会重启整个进程
+    from langgraph.prebuilt import ToolNode
     from backend.agents.tools import ALL_TOOLS
     tool_node = ToolNode(ALL_TOOLS)
     # 工具通过 InjectedState 读取 state
@@ -482,19 +577,21 @@ async def tool_node_with_state_emit(state: MediaAgentState, config: RunnableConf
             msg.content = message
     
     # ============ 4. 发送工具完成状态 ============
-    full_state = {**state, **updated_data}
+    # 过滤是按字段进行的，分别过滤再合并，不必先复制含大数据的完整 State
+    merged_frontend_state = filter_for_frontend(state)
+    merged_frontend_state.update(filter_for_frontend(updated_data))
     
     for tool_call in tool_calls:
         tool_name = tool_call.get("name", "")
-        frontend_state = filter_for_frontend(full_state)
+        frontend_state = dict(merged_frontend_state)
         await _emit_tool_status_filtered(frontend_state, config, tool_name, "complete")
     
     # ============ 5. 清除工具状态并返回 ============
     updated_data["current_tool"] = {"name": "", "status": "idle", "description": ""}
     
     # emit 到前端（过滤大数据）
-    frontend_state = filter_for_frontend({**state, **updated_data})
-    await copilotkit_emit_state(config, frontend_state)
+    merged_frontend_state["current_tool"] = updated_data["current_tool"]
+    await _emit_state_if_changed(config, merged_frontend_state)
     
     # 🔥 返回工具结果 + state_update
     # LangGraph output=FrontendViewState 会自动过滤前端数据
@@ -513,7 +610,7 @@ async def _emit_tool_status(state: dict, config: RunnableConfig, tool_name: str,
         emit_state.update(extra_data)
     # 🔥 过滤大数据后再 emit
     frontend_state = filter_for_frontend(emit_state)
-    await copilotkit_emit_state(config, frontend_state)
+    await _emit_state_if_changed(config, frontend_state)
     logger.info(f"📤 [{status}] {tool_name}")
 
 
@@ -525,7 +622,7 @@ async def _emit_tool_status_filtered(frontend_state: dict, config: RunnableConfi
         "description": TOOL_DESCRIPTIONS.get(tool_name, f"{status} {tool_name}"),
     }
     frontend_state["current_tool"] = current_tool
-    await copilotkit_emit_state(config, frontend_state)
+    await _emit_state_if_changed(config, frontend_state)
     logger.info(f"📤 [{status}] {tool_name}")
 
 
@@ -7,7 +7,7 @@
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 
 from .enums import MediaType, SubCategory
 
@@ -54,6 +54,11 @@ class SubtitleFile(BaseModel):
     path: str = Field(description="原始路径")
     name: str = Field(description="文件名")
     language: str = Field(description="字幕语言: chs, cht, eng, jpn")
+    
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "SubtitleFile":
+        """从 State 中的可信数据构建（跳过验证）"""
+        return cls.model_construct(**data)
 
 
 class ClassifiedFile(BaseModel):
@@ -64,6 +69,17 @@ class ClassifiedFile(BaseModel):
     season: int = Field(description="季数")
     # 🆕 关联的字幕文件
     subtitles: List[SubtitleFile] = Field(default_factory=list, description="关联的字幕文件")
+    
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "ClassifiedFile":
+        """从 State 中的可信数据构建（跳过验证）"""
+        return cls.model_construct(
+            path=data["path"],
+            name=data["name"],
+            episode=data.get("episode", 0),
+            season=data.get("season", 0),
+            subtitles=[SubtitleFile.from_trusted(s) for s in data.get("subtitles", [])],
+        )
 
 
 class Classification(BaseModel):
@@ -78,4 +94,25 @@ class Classification(BaseModel):
     seasons: Dict[int, List[ClassifiedFile]] = Field(default_factory=dict, description="TV 季数据")
     # 电影用 files
     files: List[ClassifiedFile] = Field(default_factory=list, description="电影文件列表")
+    
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "Classification":
+        """
+        从 State 中的可信数据构建（跳过验证）
+        
+        model_construct 不会递归转换，嵌套模型、枚举和季号（JSON 往返后为 str）在这里手动处理。
+        """
+        return cls.model_construct(
+            tmdb_id=data["tmdb_id"],
+            name=data.get("name", ""),
+            type=MediaType(data.get("type", "tv")),
+            year=data.get("year"),
+            genres=data.get("genres", []),
+            sub_category=SubCategory(data.get("sub_category", "default")),
+            seasons={
+                int(season_num): [ClassifiedFile.from_trusted(f) for f in files_data]
+                for season_num, files_data in data.get("seasons", {}).items()
+            },
+            files=[ClassifiedFile.from_trusted(f) for f in data.get("files", [])],
+        )
 
@@ -91,6 +91,17 @@ GENRE_TO_SUBCATEGORY: Dict[str, SubCategory] = {
     "脱口秀": SubCategory.VARIETY,
 }
 
+# (是否中文, 是否 TV) → (子分类名称表, 默认名称)，查表代替分支
+_SUBCATEGORY_NAME_TABLES: Dict[tuple, tuple] = {
+    (True, True): (SUBCATEGORY_TV_ZH, "电视剧"),
+    (True, False): (SUBCATEGORY_MOVIE_ZH, "电影"),
+    (False, True): (SUBCATEGORY_TV_EN, "TV Shows"),
+    (False, False): (SUBCATEGORY_MOVIE_EN, "Movies"),
+}
+
+# 所有可识别的 genre 名称（一次集合运算判断是否有命中）
+_GENRE_KEYSET = frozenset(GENRE_TO_SUBCATEGORY)
+
 
 # ============================================================
 # 辅助函数
@@ -116,9 +127,14 @@ def determine_subcategory(genres: List[str]) -> SubCategory:
         >>> determine_subcategory(["Drama", "Crime"])
         SubCategory.DEFAULT
     """
+    # 大多数剧集（剧情/犯罪等）没有任何命中，直接返回
+    if _GENRE_KEYSET.isdisjoint(genres):
+        return SubCategory.DEFAULT
+    
     for genre in genres:
-        if genre in GENRE_TO_SUBCATEGORY:
-            return GENRE_TO_SUBCATEGORY[genre]
+        sub_category = GENRE_TO_SUBCATEGORY.get(genre)
+        if sub_category is not None:
+            return sub_category
     return SubCategory.DEFAULT
 
 
@@ -138,14 +154,6 @@ def get_subcategory_name(
     Returns:
         子分类显示名称
     """
-    if language == "zh":
-        if media_type == MediaType.TV:
-            return SUBCATEGORY_TV_ZH.get(sub_category, "电视剧")
-        else:
-            return SUBCATEGORY_MOVIE_ZH.get(sub_category, "电影")
-    else:
-        if media_type == MediaType.TV:
-            return SUBCATEGORY_TV_EN.get(sub_category, "TV Shows")
-        else:
-            return SUBCATEGORY_MOVIE_EN.get(sub_category, "Movies")
+    names, default = _SUBCATEGORY_NAME_TABLES[(language == "zh", media_type == MediaType.TV)]
+    return names.get(sub_category, default)
 
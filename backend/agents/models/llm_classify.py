@@ -4,7 +4,7 @@ LLM 分类相关模型
 🔥 用于 prepare_llm_classification 和 apply_llm_classification 工具之间的数据传递
 """
 
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from pydantic import BaseModel, Field
 
 
@@ -18,6 +18,11 @@ class LLMClassifyFileItem(BaseModel):
     name: str = Field(..., description="文件名")
     path: str = Field(..., description="完整路径")
     directory: str = Field("", description="所在目录")
+    
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "LLMClassifyFileItem":
+        """从 State 中的可信数据构建（跳过验证，数据由 prepare_llm_classification 生成）"""
+        return cls.model_construct(**data)
 
 
 class LLMClassificationItem(BaseModel):
@@ -11,10 +11,17 @@
 - CurrentToolOutput: 当前工具状态
 """
 
+from functools import lru_cache
 from pydantic import BaseModel, Field
 from typing import List, Optional, Literal
 
 
+@lru_cache(maxsize=4096)
+def format_ep_range(lo: int, hi: int) -> str:
+    """格式化集数范围 E01-E24（范围组合在各系列间大量重复，结果缓存复用）"""
+    return "E%02d-E%02d" % (lo, hi)
+
+
 class StorageConfigOutput(BaseModel):
     """存储连接配置（前端显示）"""
     url: str = Field(default="", description="存储 URL")
@@ -6,7 +6,7 @@
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, Optional
 
 
 class ScannedFile(BaseModel):
@@ -21,4 +21,9 @@ class ScannedFile(BaseModel):
     # 🆕 字幕专用字段
     language: Optional[str] = Field(default=None, description="字幕语言: chs, cht, eng, jpn")
     video_ref: Optional[str] = Field(default=None, description="关联的视频文件路径")
+    
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "ScannedFile":
+        """从 State 中的可信数据构建（跳过验证，数据由 scan_media_files 生成）"""
+        return cls.model_construct(**data)
 
@@ -6,13 +6,36 @@ TMDB 集数映射表
 - 支持两种查询方式：累计编号 / (季, 集)
 """
 
-from typing import Dict, Tuple, Optional, List
+import threading
+from typing import Dict, Optional, List
+from collections import OrderedDict
 from dataclasses import dataclass, field
+from functools import lru_cache
 
 
-@dataclass
+@lru_cache(maxsize=4096)
+def _format_output_name(season: int, episode: int) -> str:
+    """SxxExx 格式化（季/集组合有限，结果缓存复用）"""
+    return "S%02dE%02d" % (season, episode)
+
+
+@lru_cache(maxsize=256)
+def _parse_season_context(context: str) -> Optional[int]:
+    """解析 "season_N" 得到季号（context 种类很少，解析结果缓存复用）"""
+    try:
+        return int(context.split("_")[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _season_episode_key(season: int, episode: int) -> int:
+    """(季, 集) 打包成单个整数键，查询时不必构造元组"""
+    return (season << 16) | episode
+
+
+@dataclass(slots=True, frozen=True)
 class EpisodeInfo:
-    """单集信息"""
+    """单集信息（不可变，构建后只读）"""
     season: int              # 季号
     episode_in_season: int   # 季内第几集（从1开始）
     tmdb_episode: int        # TMDB 的 episode_number（用于输出文件名）
@@ -20,7 +43,7 @@ class EpisodeInfo:
     
     def to_output_name(self) -> str:
         """生成输出文件名格式 SxxExx"""
-        return f"S{self.season:02d}E{self.tmdb_episode:02d}"
+        return _format_output_name(self.season, self.tmdb_episode)
 
 
 @dataclass
@@ -33,7 +56,10 @@ class TMDBMapping:
     
     # 两种查询索引（自动构建）
     by_cumulative: Dict[int, EpisodeInfo] = field(default_factory=dict)
-    by_season_episode: Dict[Tuple[int, int], EpisodeInfo] = field(default_factory=dict)
+    # (季, 集) 索引，键为 _season_episode_key 打包后的整数
+    by_season_episode: Dict[int, EpisodeInfo] = field(default_factory=dict)
+    # 按季分组（季内按添加顺序），季信息查询不必扫描全部集数
+    by_season: Dict[int, List[EpisodeInfo]] = field(default_factory=dict)
     
     # 元数据
     total_seasons: int = 0
@@ -53,24 +79,35 @@ class TMDBMapping:
         if context == "cumulative":
             return self.by_cumulative.get(number)
         elif context.startswith("season_"):
-            try:
-                season = int(context.split("_")[1])
-                return self.by_season_episode.get((season, number))
-            except (IndexError, ValueError):
+            season = _parse_season_context(context)
+            if season is None:
                 return None
+            # 热路径内联 _season_episode_key
+            return self.by_season_episode.get((season << 16) | number)
         else:
             return None
     
+    def add_episode(self, episode_info: EpisodeInfo):
+        """添加一集到所有索引"""
+        self.by_cumulative[episode_info.cumulative] = episode_info
+        key = _season_episode_key(episode_info.season, episode_info.episode_in_season)
+        self.by_season_episode[key] = episode_info
+        self.by_season.setdefault(episode_info.season, []).append(episode_info)
+    
+    def add_season(self, season: int, episodes: List[EpisodeInfo]):
+        """批量添加同一季的所有集（一次 dict.update 代替逐集写入）"""
+        self.by_cumulative.update((e.cumulative, e) for e in episodes)
+        base = season << 16
+        self.by_season_episode.update((base | e.episode_in_season, e) for e in episodes)
+        self.by_season.setdefault(season, []).extend(episodes)
+    
     def get_season_info(self, season: int) -> Dict:
         """获取某一季的信息"""
-        episodes = [
-            ep for ep in self.by_cumulative.values() 
-            if ep.season == season
-        ]
+        episodes = self.by_season.get(season)
         if not episodes:
             return {}
         
-        episodes.sort(key=lambda x: x.episode_in_season)
+        episodes = sorted(episodes, key=lambda x: x.episode_in_season)
         return {
             "season": season,
             "episode_count": len(episodes),
@@ -82,8 +119,7 @@ class TMDBMapping:
     
     def get_all_seasons_info(self) -> List[Dict]:
         """获取所有季的信息"""
-        seasons = set(ep.season for ep in self.by_cumulative.values())
-        return [self.get_season_info(s) for s in sorted(seasons)]
+        return [self.get_season_info(s) for s in sorted(self.by_season)]
 
 
 def build_episode_mapping(tmdb_id: int, tmdb_service) -> Optional[TMDBMapping]:
@@ -121,40 +157,53 @@ def build_episode_mapping(tmdb_id: int, tmdb_service) -> Optional[TMDBMapping]:
         if not episodes:
             continue
         
-        # 遍历每一集
-        for i, ep in enumerate(episodes):
-            cumulative += 1
-            tmdb_ep = ep.get('episode_number', i + 1)
-            
-            episode_info = EpisodeInfo(
+        # 整季一次性构建，累计编号接着上一季往下数
+        season_episodes = [
+            EpisodeInfo(
                 season=season_num,
-                episode_in_season=i + 1,
-                tmdb_episode=tmdb_ep,
-                cumulative=cumulative,
+                episode_in_season=i,
+                tmdb_episode=ep.get('episode_number', i),
+                cumulative=cumulative + i,
             )
-            
-            # 添加到两个索引
-            mapping.by_cumulative[cumulative] = episode_info
-            mapping.by_season_episode[(season_num, i + 1)] = episode_info
+            for i, ep in enumerate(episodes, 1)
+        ]
+        cumulative += len(season_episodes)
+        
+        # 添加到所有索引
+        mapping.add_season(season_num, season_episodes)
     
     mapping.total_episodes = cumulative
     return mapping
 
 
-# 缓存映射表，避免重复构建
-_mapping_cache: Dict[int, TMDBMapping] = {}
+# 缓存映射表，避免重复构建（LRU，超出容量淘汰最久未使用的）
+_MAPPING_CACHE_SIZE = 128
+_mapping_cache: "OrderedDict[int, TMDBMapping]" = OrderedDict()
+# 多个 TMDB ID 会在线程池中并行构建，缓存的读写都要加锁（构建本身在锁外进行）
+_mapping_cache_lock = threading.Lock()
 
 
 def get_or_build_mapping(tmdb_id: int, tmdb_service) -> Optional[TMDBMapping]:
     """获取或构建映射表（带缓存）"""
-    if tmdb_id not in _mapping_cache:
-        mapping = build_episode_mapping(tmdb_id, tmdb_service)
-        if mapping:
+    with _mapping_cache_lock:
+        mapping = _mapping_cache.get(tmdb_id)
+        if mapping is not None:
+            _mapping_cache.move_to_end(tmdb_id)
+            return mapping
+    
+    # 构建失败（None）不缓存，下次重试
+    mapping = build_episode_mapping(tmdb_id, tmdb_service)
+    if mapping:
+        with _mapping_cache_lock:
             _mapping_cache[tmdb_id] = mapping
-    return _mapping_cache.get(tmdb_id)
+            _mapping_cache.move_to_end(tmdb_id)
+            while len(_mapping_cache) > _MAPPING_CACHE_SIZE:
+                _mapping_cache.popitem(last=False)
+    return mapping
 
 
 def clear_mapping_cache():
     """清空缓存"""
-    _mapping_cache.clear()
+    with _mapping_cache_lock:
+        _mapping_cache.clear()
 
@@ -17,26 +17,58 @@
         # ... 使用 service ...
 """
 
-import hashlib
 import logging
-from typing import Dict, Any, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 
 from backend.services.storage_base import StorageService
 from backend.services.storage_factory import create_storage_service_sync
 
 _logger = logging.getLogger(__name__)
 
-# 全局服务缓存：{config_hash: StorageService}
-_storage_cache: Dict[str, StorageService] = {}
-_strm_cache: Dict[str, StorageService] = {}
+# 每个缓存最多保留的服务实例数（超出后淘汰最久未使用的）
+_SERVICE_CACHE_SIZE = 16
 
+# 全局服务缓存（LRU）：{config_key: StorageService}
+_storage_cache: "OrderedDict[Tuple[str, str, str], StorageService]" = OrderedDict()
+_strm_cache: "OrderedDict[Tuple[str, str, str], StorageService]" = OrderedDict()
 
-def _config_hash(config: Dict[str, Any]) -> str:
-    """计算配置的哈希值（用于缓存键）"""
-    # 只使用关键字段计算哈希
-    key_fields = ["url", "username", "password"]
-    key_str = "|".join(str(config.get(k, "")) for k in key_fields)
-    return hashlib.md5(key_str.encode()).hexdigest()[:16]
+# 连接验证有效期（秒）：期间用相同配置重连，跳过 list_directory 认证探测
+_VERIFY_TTL_SECONDS = 60.0
+
+# 最近一次验证通过的时间：{config_key: time.monotonic()}
+_storage_verified_at: Dict[Tuple[str, str, str], float] = {}
+
+
+def _config_key(config: Dict[str, Any]) -> Tuple[str, str, str]:
+    """
+    计算配置的缓存键
+    
+    直接用关键字段组成的元组作为 dict 键，每次工具调用都会走这里，
+    元组哈希比 MD5 摘要便宜得多。键中含密码，不要写入日志。
+    """
+    return (
+        str(config.get("url", "")),
+        str(config.get("username", "")),
+        str(config.get("password", "")),
+    )
+
+
+def _cache_get(cache: OrderedDict, key: Tuple[str, str, str]) -> Optional[StorageService]:
+    """LRU 读取：命中时标记为最近使用"""
+    service = cache.get(key)
+    if service is not None:
+        cache.move_to_end(key)
+    return service
+
+
+def _cache_put(cache: OrderedDict, key: Tuple[str, str, str], service: StorageService):
+    """LRU 写入：超出容量时淘汰最久未使用的实例"""
+    cache[key] = service
+    cache.move_to_end(key)
+    while len(cache) > _SERVICE_CACHE_SIZE:
+        cache.popitem(last=False)
 
 
 def get_storage_service(state: Dict[str, Any]) -> Optional[StorageService]:
@@ -56,9 +88,10 @@ def get_storage_service(state: Dict[str, Any]) -> Optional[StorageService]:
         return None
     
     # 检查缓存
-    cache_key = _config_hash(config)
-    if cache_key in _storage_cache:
-        return _storage_cache[cache_key]
+    cache_key = _config_key(config)
+    service = _cache_get(_storage_cache, cache_key)
+    if service is not None:
+        return service
     
     # 创建新服务
     try:
@@ -68,7 +101,7 @@ def get_storage_service(state: Dict[str, Any]) -> Optional[StorageService]:
             password=config.get("password", ""),
             base_path="/",  # 固定为根目录，实际路径由工具控制
         )
-        _storage_cache[cache_key] = service
+        _cache_put(_storage_cache, cache_key, service)
         _logger.info(f"📦 创建存储服务: {config.get('url')}")
         return service
     except Exception as e:
@@ -93,9 +126,10 @@ def get_strm_target_service(state: Dict[str, Any]) -> Optional[StorageService]:
         return None
     
     # 检查缓存
-    cache_key = _config_hash(config)
-    if cache_key in _strm_cache:
-        return _strm_cache[cache_key]
+    cache_key = _config_key(config)
+    service = _cache_get(_strm_cache, cache_key)
+    if service is not None:
+        return service
     
     # 创建新服务
     try:
@@ -105,7 +139,7 @@ def get_strm_target_service(state: Dict[str, Any]) -> Optional[StorageService]:
             password=config.get("password", ""),
             base_path="/",
         )
-        _strm_cache[cache_key] = service
+        _cache_put(_strm_cache, cache_key, service)
         _logger.info(f"📦 创建 STRM 目标服务: {config.get('url')}")
         return service
     except Exception as e:
@@ -113,7 +147,27 @@ def get_strm_target_service(state: Dict[str, Any]) -> Optional[StorageService]:
         return None
 
 
-def cache_storage_service(config: Dict[str, Any], service: StorageService):
+def get_verified_storage_service(config: Dict[str, Any]) -> Optional[StorageService]:
+    """
+    获取最近验证过连接的存储服务实例
+    
+    在 connect_webdav 中使用：相同配置在 _VERIFY_TTL_SECONDS 内重连时，
+    直接复用缓存的服务，省掉一次认证探测请求。
+    
+    Args:
+        config: 存储配置（包含 url, username, password）
+    
+    Returns:
+        StorageService 实例，不在有效期内或未缓存则返回 None
+    """
+    cache_key = _config_key(config)
+    verified_at = _storage_verified_at.get(cache_key)
+    if verified_at is None or time.monotonic() - verified_at >= _VERIFY_TTL_SECONDS:
+        return None
+    return _cache_get(_storage_cache, cache_key)
+
+
+def cache_storage_service(config: Dict[str, Any], service: StorageService, verified: bool = True):
     """
     缓存存储服务实例
     
@@ -122,10 +176,13 @@ def cache_storage_service(config: Dict[str, Any], service: StorageService):
     Args:
         config: 存储配置（包含 url, username, password）
         service: 已创建的服务实例
+        verified: 本次是否刚探测验证过连接（是则刷新验证时间）
     """
-    cache_key = _config_hash(config)
-    _storage_cache[cache_key] = service
-    _logger.info(f"📦 缓存存储服务: {config.get('url')} (key={cache_key})")
+    cache_key = _config_key(config)
+    _cache_put(_storage_cache, cache_key, service)
+    if verified:
+        _storage_verified_at[cache_key] = time.monotonic()
+    _logger.info(f"📦 缓存存储服务: {config.get('url')}")
 
 
 def cache_strm_service(config: Dict[str, Any], service: StorageService):
@@ -138,14 +195,13 @@ def cache_strm_service(config: Dict[str, Any], service: StorageService):
         config: 存储配置（包含 url, username, password）
         service: 已创建的服务实例
     """
-    cache_key = _config_hash(config)
-    _strm_cache[cache_key] = service
-    _logger.info(f"📦 缓存 STRM 目标服务: {config.get('url')} (key={cache_key})")
+    _cache_put(_strm_cache, _config_key(config), service)
+    _logger.info(f"📦 缓存 STRM 目标服务: {config.get('url')}")
 
 
 def clear_service_cache():
     """清除所有服务缓存（用于测试）"""
-    global _storage_cache, _strm_cache
-    _storage_cache = {}
-    _strm_cache = {}
+    _storage_cache.clear()
+    _strm_cache.clear()
+    _storage_verified_at.clear()
     _logger.info("🧹 清除服务缓存")
@@ -138,6 +138,10 @@ class MediaAgentState(CopilotKitState, total=False):
     # 🔥 大数据：700+ 文件约 200KB
     # 🔥 数据结构：List[ScannedFile] - 见 models.py
     
+    scanned_count: int
+    # len(scanned_files)，与 scanned_files 同时写入
+    # 🔥 chat_node 每轮只需要文件数，读它就不必加载整个 scanned_files
+    
     classifications: Dict[str, Any]
     # {<tmdb_id>: {"tmdb_id": <id>, "name": "系列名", "type": "tv", "seasons": {...}}}
     # 🔥 大数据：包含每个文件的分类信息
@@ -27,8 +27,22 @@
 """
 
 import json
+from functools import lru_cache
 from typing import Dict, Any, Tuple
 
+import orjson
+
+# 每次工具调用都会走这里，预先绑定避免重复的模块属性查找
+_dumps = orjson.dumps
+_loads = orjson.loads
+_OPT_NON_STR_KEYS = orjson.OPT_NON_STR_KEYS
+
+
+@lru_cache(maxsize=64)
+def _message_only_response(message: str) -> str:
+    """只有消息的响应（错误提示等固定文案会在重试中反复出现，缓存序列化结果）"""
+    return '{"message":' + _dumps(message).decode() + ',"state_update":{}}'
+
 
 def make_tool_response(message: str, state_update: Dict[str, Any] = None) -> str:
     """
@@ -51,17 +65,21 @@ def make_tool_response(message: str, state_update: Dict[str, Any] = None) -> str
             {"scanned_files": [...], "scan_result": {...}}
         )
     """
-    if state_update:
+    if not state_update:
+        # 没有 state_update 时也返回 JSON 格式（便于统一解析），只序列化 message
+        return _message_only_response(message)
+    
+    try:
+        return _dumps(
+            {"message": message, "state_update": state_update},
+            option=_OPT_NON_STR_KEYS,
+        ).decode()
+    except TypeError:
+        # orjson 不支持的类型（如超过 64 位的整数），交给标准库兜底
         return json.dumps({
             "message": message,
             "state_update": state_update
         }, ensure_ascii=False)
-    else:
-        # 没有 state_update 时也返回 JSON 格式（便于统一解析）
-        return json.dumps({
-            "message": message,
-            "state_update": {}
-        }, ensure_ascii=False)
 
 
 def parse_tool_response(content: str) -> Tuple[str, Dict[str, Any]]:
@@ -77,11 +95,18 @@ def parse_tool_response(content: str) -> Tuple[str, Dict[str, Any]]:
         - state_update: 要更新的 State 字段（可能为空 dict）
     """
     try:
-        data = json.loads(content)
-        if isinstance(data, dict) and "message" in data:
-            return data["message"], data.get("state_update", {})
-    except json.JSONDecodeError:
-        pass
+        data = _loads(content)
+    except orjson.JSONDecodeError:
+        # orjson 不接受 json.dumps 可能输出的 NaN/Infinity，交给标准库兜底
+        data = None
+        if content.lstrip().startswith("{"):
+            try:
+                data = json.loads(content)
+            except json.JSONDecodeError:
+                pass
+    
+    if isinstance(data, dict) and "message" in data:
+        return data["message"], data.get("state_update", {})
     
     # 不是 JSON 格式，直接返回原内容
     return content, {}
@@ -45,79 +45,79 @@ Agent 工具包
 ================================================================================
 """
 
-# 连接工具
-from .connection_tools import (
-    connect_webdav,
-    set_user_config,  # 🔧 配置用户参数
-)
-
-# 扫描工具
-from .scan_tools import (
-    scan_media_files,
-)
-
-# TMDB 工具（精简版 - 2 个）
-from .tmdb_tools import (
-    search_tmdb,
-    get_tmdb_details,
-)
-
-# 智能分析工具
-from .smart_analyze_tools import (
-    analyze_and_classify,
-    analyze_and_classify_v2,  # 🔥 新架构：代码不判断，只查表
-    get_status,
-    list_files,
-)
-
-# 🔥 LLM 分类工具（终极方案：让 LLM 做所有判断）
-from .llm_classify_tools import (
-    prepare_llm_classification,
-    generate_classification,  # 原 apply_llm_classification
-)
-
-# 整理工具（合并版 - 1 个）
-from .organize_tools import (
-    organize_files,
-)
-
-# STRM 工具（合并版 - 3 个）
-from .strm_tools import (
-    connect_strm_target,
-    generate_strm,
-    retry_failed_uploads,  # 🆕 重试失败的上传
-)
-
-# 🧪 测试工具（临时）
-from .test_tool import test_card
+import importlib
+
+# 🔥 延迟导入（PEP 562）：导入本包时不加载任何工具模块，
+# 访问某个工具或 ALL_TOOLS 时才导入对应子模块
+
+# 工具名 → 所在子模块
+_TOOL_MODULES = {
+    # 连接工具
+    "connect_webdav": "connection_tools",
+    "set_user_config": "connection_tools",  # 🔧 配置用户参数
+    # 扫描工具
+    "scan_media_files": "scan_tools",
+    # TMDB 工具（精简版 - 2 个）
+    "search_tmdb": "tmdb_tools",
+    "get_tmdb_details": "tmdb_tools",
+    # 智能分析工具
+    "analyze_and_classify": "smart_analyze_tools",
+    "analyze_and_classify_v2": "smart_analyze_tools",  # 🔥 新架构：代码不判断，只查表
+    "get_status": "smart_analyze_tools",
+    "list_files": "smart_analyze_tools",
+    # 🔥 LLM 分类工具（终极方案：让 LLM 做所有判断）
+    "prepare_llm_classification": "llm_classify_tools",
+    "generate_classification": "llm_classify_tools",  # 原 apply_llm_classification
+    # 整理工具（合并版 - 1 个）
+    "organize_files": "organize_tools",
+    # STRM 工具（合并版 - 3 个）
+    "connect_strm_target": "strm_tools",
+    "generate_strm": "strm_tools",
+    "retry_failed_uploads": "strm_tools",  # 🆕 重试失败的上传
+    # 🧪 测试工具（临时）
+    "test_card": "test_tool",
+}
 
 
 # ============ 所有工具列表 ============
 
-ALL_TOOLS = [
+_ALL_TOOL_NAMES = (
     # 连接和扫描
-    connect_webdav,
-    scan_media_files,
-    connect_strm_target,
+    "connect_webdav",
+    "scan_media_files",
+    "connect_strm_target",
     # TMDB
-    search_tmdb,
-    get_tmdb_details,
+    "search_tmdb",
+    "get_tmdb_details",
     # 分析
-    analyze_and_classify,
-    analyze_and_classify_v2,  # 🔥 新架构
-    prepare_llm_classification,  # 🔥 终极方案
-    generate_classification,     # 🔥 生成最终分类结果
-    get_status,
+    "analyze_and_classify",
+    "analyze_and_classify_v2",  # 🔥 新架构
+    "prepare_llm_classification",  # 🔥 终极方案
+    "generate_classification",     # 🔥 生成最终分类结果
+    "get_status",
     # 输出
-    organize_files,
-    generate_strm,
-    retry_failed_uploads,  # 🆕 重试失败的上传
+    "organize_files",
+    "generate_strm",
+    "retry_failed_uploads",  # 🆕 重试失败的上传
     # 辅助工具
-    list_files,
-    set_user_config,
+    "list_files",
+    "set_user_config",
     # 测试工具
-    test_card,
-]
+    "test_card",
+)
+
+
+def __getattr__(name):
+    if name == "ALL_TOOLS":
+        value = [__getattr__(tool_name) for tool_name in _ALL_TOOL_NAMES]
+    elif name in _TOOL_MODULES:
+        module = importlib.import_module(f"{__name__}.{_TOOL_MODULES[name]}")
+        value = getattr(module, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # 缓存到模块命名空间，之后的访问不再经过 __getattr__
+    globals()[name] = value
+    return value
 
 
 __all__ = [
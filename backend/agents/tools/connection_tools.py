@@ -21,7 +21,13 @@ from langgraph.prebuilt import InjectedState
 
 from backend.services.storage_factory import create_storage_service_sync
 from backend.agents.tool_response import make_tool_response
-from backend.agents.services import get_storage_service, get_strm_target_service, cache_storage_service, cache_strm_service
+from backend.agents.services import (
+    get_storage_service,
+    get_strm_target_service,
+    get_verified_storage_service,
+    cache_storage_service,
+    cache_strm_service,
+)
 from backend.agents.state import MediaAgentState
 
 
@@ -69,24 +75,31 @@ def connect_webdav(
         if not scan_path.startswith('/'):
             scan_path = '/' + scan_path
         
-        # 使用工厂函数创建存储服务（自动检测类型）
-        service = create_storage_service_sync(
-            url=base_url,
-            username=username,
-            password=password,
-            base_path="/",  # 固定为根目录
+        # 🔥 相同配置刚验证过（如重复连接），直接复用，跳过认证探测
+        service = get_verified_storage_service(
+            {"url": base_url, "username": username, "password": password}
         )
+        probed = service is None
         
-        # 🔥 立即验证连接（触发登录），确保服务已认证
-        # 对于 Alist 服务，这会调用 _login_sync() 获取 token
-        try:
-            # 尝试列出根目录来验证连接和认证
-            service.list_directory("/")
-        except Exception as auth_error:
-            return make_tool_response(
-                f"❌ 连接失败: 认证错误 - {str(auth_error)}\n\n请检查用户名和密码是否正确。",
-                {"storage_config": {}}
+        if probed:
+            # 使用工厂函数创建存储服务（自动检测类型）
+            service = create_storage_service_sync(
+                url=base_url,
+                username=username,
+                password=password,
+                base_path="/",  # 固定为根目录
             )
+            
+            # 🔥 立即验证连接（触发登录），确保服务已认证
+            # 对于 Alist 服务，这会调用 _login_sync() 获取 token
+            try:
+                # 尝试列出根目录来验证连接和认证
+                service.list_directory("/")
+            except Exception as auth_error:
+                return make_tool_response(
+                    f"❌ 连接失败: 认证错误 - {str(auth_error)}\n\n请检查用户名和密码是否正确。",
+                    {"storage_config": {}}
+                )
         
         # 构建新的 storage_config
         new_storage_config = {
@@ -100,7 +113,7 @@ def connect_webdav(
         }
         
         # 🔥 缓存服务实例，确保后续工具可以复用
-        cache_storage_service(new_storage_config, service)
+        cache_storage_service(new_storage_config, service, verified=probed)
         
         # 构建返回消息
         service_name = "Alist API" if service.service_type == "alist" else "WebDAV"
@@ -116,6 +129,7 @@ def connect_webdav(
         return make_tool_response(message, {
             "storage_config": new_storage_config,
             "scanned_files": [],  # 清空之前的扫描结果
+            "scanned_count": 0,
         })
         
     except Exception as e:
@@ -200,47 +214,61 @@ def get_connection_status(
     Returns:
         JSON: {"message": "...", "state_update": {}}
     """
-    message = ""
+    # 从 State 获取配置（每个字段只取一次）
+    state = state or {}
+    storage_config = state.get("storage_config") or {}
+    strm_target_config = state.get("strm_target_config") or {}
+    user_config = state.get("user_config") or {}
     
-    # 从 State 获取配置
-    storage_config = state.get("storage_config", {}) if state else {}
-    strm_target_config = state.get("strm_target_config", {}) if state else {}
-    user_config = state.get("user_config", {}) if state else {}
-    scanned_files = state.get("scanned_files", []) if state else []
+    lines = []
     
     # 源存储状态
     if storage_config.get("connected"):
-        service_type = storage_config.get('type', 'unknown')
-        service_name = "Alist API" if service_type == "alist" else "WebDAV"
+        service_name = "Alist API" if storage_config.get('type') == "alist" else "WebDAV"
+        url = storage_config.get('url', '未知')
+        scan_path = storage_config.get('scan_path', '/')
+        target_path = storage_config.get('target_path')
+        # 文件数优先读 scanned_count，不必加载整个 scanned_files
+        scanned_count = state.get("scanned_count")
+        if scanned_count is None:
+            scanned_count = len(state.get("scanned_files") or [])
         
-        message += f"📁 源存储\n"
-        message += f"• 服务器: {storage_config.get('url', '未知')}\n"
-        message += f"• 连接方式: {service_name}\n"
-        message += f"• 扫描路径: {storage_config.get('scan_path', '/')}\n"
-        if storage_config.get('target_path'):
-            message += f"• 整理路径: {storage_config.get('target_path')}\n"
-        message += f"• 已扫描文件: {len(scanned_files)} 个\n"
+        lines.append("📁 源存储")
+        lines.append(f"• 服务器: {url}")
+        lines.append(f"• 连接方式: {service_name}")
+        lines.append(f"• 扫描路径: {scan_path}")
+        if target_path:
+            lines.append(f"• 整理路径: {target_path}")
+        lines.append(f"• 已扫描文件: {scanned_count} 个")
     else:
-        message += "📁 源存储: 未连接\n"
+        lines.append("📁 源存储: 未连接")
     
-    message += "\n"
+    lines.append("")
     
     # STRM 目标存储状态
     if strm_target_config.get("connected"):
-        message += f"📤 STRM 目标\n"
-        message += f"• 服务器: {strm_target_config.get('url', '未知')}\n"
-        message += f"• 输出路径: {strm_target_config.get('target_path', '/')}\n"
+        strm_url = strm_target_config.get('url', '未知')
+        strm_target_path = strm_target_config.get('target_path', '/')
+        lines.append("📤 STRM 目标")
+        lines.append(f"• 服务器: {strm_url}")
+        lines.append(f"• 输出路径: {strm_target_path}")
     else:
-        message += "📤 STRM 目标: 未连接\n"
+        lines.append("📤 STRM 目标: 未连接")
     
-    message += "\n"
+    lines.append("")
     
     # 通用配置
-    message += f"⚙️ 配置\n"
-    message += f"• 命名语言: {user_config.get('naming_language', 'zh')}\n"
-    message += f"• 整理模式: {'复制' if user_config.get('use_copy', True) else '移动'}\n"
-    message += f"• 扫描延迟: {user_config.get('scan_delay', 0.0)}s\n"
-    message += f"• 上传延迟: {user_config.get('upload_delay', 0.0)}s\n"
+    naming_language = user_config.get('naming_language', 'zh')
+    organize_mode = '复制' if user_config.get('use_copy', True) else '移动'
+    scan_delay = user_config.get('scan_delay', 0.0)
+    upload_delay = user_config.get('upload_delay', 0.0)
+    lines.append("⚙️ 配置")
+    lines.append(f"• 命名语言: {naming_language}")
+    lines.append(f"• 整理模式: {organize_mode}")
+    lines.append(f"• 扫描延迟: {scan_delay}s")
+    lines.append(f"• 上传延迟: {upload_delay}s")
+    lines.append("")
+    message = "\n".join(lines)
     
     # 返回只有消息，不更新 State
     return make_tool_response(message)
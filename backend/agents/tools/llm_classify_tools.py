@@ -6,15 +6,20 @@ LLM 分类工具
 不再用代码做任何「匹配」或「判断」，所有分类决策由 LLM 完成。
 """
 
+import csv
 import json
 import logging
-from typing import Dict, Any, List, Annotated
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Annotated
+from pydantic import TypeAdapter
 from langchain.tools import tool
+from langchain_core.runnables import RunnableConfig
 from langgraph.prebuilt import InjectedState
 
 from backend.agents.tool_response import make_tool_response
 from backend.services.tmdb_service import get_tmdb_service
-import re
 from backend.agents.models import (
     ScannedFile,
     Classification,
@@ -27,19 +32,84 @@ from backend.agents.models import (
     LLMClassifyFileItem,
     LLMClassificationResult,
 )
-from backend.agents.models.output import SeasonInfo
+from backend.agents.models.output import SeasonInfo, format_ep_range
+from backend.agents.classifier import BASE_NAME_EXT_SUFFIXES, BASE_NAME_LANG_SUFFIXES
 
 logger = logging.getLogger(__name__)
 
+# 分类结果序列化：整个列表一次交给 pydantic-core
+_CLASSIFICATION_LIST_ADAPTER = TypeAdapter(List[Classification])
 
-def _parse_scanned_files(scanned_files_data: List[Any]) -> List[ScannedFile]:
-    """解析扫描文件数据"""
+# 单次交给 LLM 分类的视频文件上限（提示词和 State 中的文件列表都按此截断）
+_LLM_MAX_FILES = 200
+
+# TMDB 请求并发数（纯 I/O 等待，多个 ID 并行请求，总耗时取最慢的一个）
+_TMDB_FETCH_WORKERS = 8
+
+
+# 各会话最近一次解析的 (scanned_files 原始列表, 解析结果)：{thread_id: (列表, 结果)}
+# 同一会话中 prepare → generate 拿到的是同一个 State 列表对象，直接复用；
+# 持有原列表的强引用，保证 is 比较不会因对象回收、id 复用而误命中。
+# 按会话分开，并发会话互不挤占；只保留最近活跃的少量会话，不长期占住旧的扫描结果
+_PARSED_CACHE_SIZE = 8
+_parsed_scanned_cache: "OrderedDict[str, Tuple[List[Any], List[ScannedFile]]]" = OrderedDict()
+_parsed_scanned_lock = threading.Lock()
+
+
+def _get_thread_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    """从 RunnableConfig 中提取 thread_id（直接调用工具、没有 config 时返回 None）"""
+    if not config:
+        return None
+    return config.get("configurable", {}).get("thread_id")
+
+
+def _get_cached_parse(thread_id: Optional[str], scanned_files_data: List[Any]) -> Optional[List[ScannedFile]]:
+    """取该会话对同一列表对象的解析结果，没有则返回 None"""
+    if thread_id is None:
+        return None
+    with _parsed_scanned_lock:
+        cached = _parsed_scanned_cache.get(thread_id)
+        if cached is None or cached[0] is not scanned_files_data:
+            return None
+        _parsed_scanned_cache.move_to_end(thread_id)
+        return cached[1]
+
+
+def _parse_scanned_files(scanned_files_data: List[Any], thread_id: Optional[str] = None) -> List[ScannedFile]:
+    """解析扫描文件数据（同一会话重复解析同一列表对象时复用上次结果，调用方不要修改返回值）"""
+    cached_files = _get_cached_parse(thread_id, scanned_files_data)
+    if cached_files is not None:
+        return cached_files
+    
     files = []
     for f in scanned_files_data:
         if isinstance(f, dict):
-            files.append(ScannedFile.model_validate(f))
+            files.append(ScannedFile.from_trusted(f))
         elif isinstance(f, ScannedFile):
             files.append(f)
+    
+    if thread_id is not None:
+        with _parsed_scanned_lock:
+            _parsed_scanned_cache[thread_id] = (scanned_files_data, files)
+            _parsed_scanned_cache.move_to_end(thread_id)
+            while len(_parsed_scanned_cache) > _PARSED_CACHE_SIZE:
+                _parsed_scanned_cache.popitem(last=False)
+    return files
+
+
+def _parse_subtitle_files(scanned_files_data: List[Any], thread_id: Optional[str] = None) -> List[ScannedFile]:
+    """只解析字幕文件：先按 type 过滤再构建模型，视频文件不构建"""
+    cached_files = _get_cached_parse(thread_id, scanned_files_data)
+    if cached_files is not None:
+        return [f for f in cached_files if f.type == 'subtitle']
+    
+    files = []
+    for f in scanned_files_data:
+        if isinstance(f, dict):
+            if f.get("type") == 'subtitle':
+                files.append(ScannedFile.from_trusted(f))
+        elif isinstance(f, ScannedFile) and f.type == 'subtitle':
+            files.append(f)
     return files
 
 
@@ -54,13 +124,17 @@ def _get_base_name(filename: str) -> str:
         [001].tcjp.ass → [001]
     """
     # 移除扩展名
-    name = re.sub(r'\.(srt|ass|ssa|sub|mkv|mp4|avi|wmv|flv|mov)$', '', filename, flags=re.IGNORECASE)
+    stem, dot, suffix = filename.rpartition('.')
+    if dot and suffix.lower() in BASE_NAME_EXT_SUFFIXES:
+        filename = stem
+        stem, dot, suffix = filename.rpartition('.')
     # 移除语言标识（包括复合语言标识如 scjp, tcjp）
-    name = re.sub(r'\.(chs|cht|chi|eng|jpn|jap|kor|und|sc|tc|scjp|tcjp|chtjp|chsjp)$', '', name, flags=re.IGNORECASE)
-    return name
+    if dot and suffix.lower() in BASE_NAME_LANG_SUFFIXES:
+        filename = stem
+    return filename
 
 
-def _build_file_list_text(files: List[ScannedFile], max_files: int = 200) -> str:
+def _build_file_list_text(files: List[ScannedFile], max_files: int = _LLM_MAX_FILES) -> str:
     """构建文件列表文本（用于 LLM 输入）"""
     video_files = [f for f in files if f.type == 'video']
     
@@ -77,13 +151,29 @@ def _build_file_list_text(files: List[ScannedFile], max_files: int = 200) -> str
     return "\n".join(lines)
 
 
+def _get_tmdb_details(tmdb_id: int, is_movie: bool) -> Optional[Any]:
+    """获取 TMDB 详情（TMDBService 内部已带缓存）"""
+    tmdb = get_tmdb_service()
+    return tmdb.get_movie_details(tmdb_id) if is_movie else tmdb.get_tv_details(tmdb_id)
+
+
+def _fetch_concurrently(fetch, tmdb_ids: List[int]) -> List[Any]:
+    """对每个 TMDB ID 并行调用 fetch，结果顺序与 tmdb_ids 一致"""
+    if len(tmdb_ids) <= 1:
+        return [fetch(tmdb_id) for tmdb_id in tmdb_ids]
+    with ThreadPoolExecutor(max_workers=min(_TMDB_FETCH_WORKERS, len(tmdb_ids))) as executor:
+        return list(executor.map(fetch, tmdb_ids))
+
+
 def _build_tmdb_info_text(tmdb_ids: List[int]) -> str:
     """构建 TMDB 信息文本（用于 LLM 输入）"""
     tmdb = get_tmdb_service()
     lines = []
     
-    for tmdb_id in tmdb_ids:
-        mapping = get_or_build_mapping(tmdb_id, tmdb)
+    # 并行构建映射表，按原顺序输出
+    mappings = _fetch_concurrently(lambda tmdb_id: get_or_build_mapping(tmdb_id, tmdb), tmdb_ids)
+    
+    for tmdb_id, mapping in zip(tmdb_ids, mappings):
         if not mapping:
             continue
         
@@ -94,7 +184,7 @@ def _build_tmdb_info_text(tmdb_ids: List[int]) -> str:
             ep_count = season_info['episode_count']
             ep_start = season_info['tmdb_ep_start']
             ep_end = season_info['tmdb_ep_end']
-            lines.append(f"- 第{s}季: {ep_count}集 (E{ep_start:02d}-E{ep_end:02d})")
+            lines.append(f"- 第{s}季: {ep_count}集 ({format_ep_range(ep_start, ep_end)})")
         
         lines.append("")
     
@@ -104,6 +194,8 @@ def _build_tmdb_info_text(tmdb_ids: List[int]) -> str:
 @tool
 def prepare_llm_classification(
     tmdb_ids_json: str,
+    offset: int = 0,
+    config: RunnableConfig = None,
     state: Annotated[dict, InjectedState] = None,
 ) -> str:
     """
@@ -113,6 +205,7 @@ def prepare_llm_classification(
     
     Args:
         tmdb_ids_json: TMDB ID 列表的 JSON，如 "[30977, 46260]"
+        offset: 从第几个视频开始（视频超过单次上限时分批分类，默认 0）
     
     Returns:
         结构化的分类数据，LLM 可以直接使用
@@ -137,14 +230,30 @@ def prepare_llm_classification(
         return make_tool_response("❌ 请提供 TMDB ID 列表")
     
     # 解析文件
-    scanned_files = _parse_scanned_files(scanned_files_data)
+    scanned_files = _parse_scanned_files(scanned_files_data, _get_thread_id(config))
     video_files = [f for f in scanned_files if f.type == 'video']
     
     if not video_files:
         return make_tool_response("❌ 扫描结果中没有视频文件")
     
+    if offset < 0 or offset >= len(video_files):
+        return make_tool_response(f"❌ offset 超出范围（共 {len(video_files)} 个视频）")
+    
+    # 本批文件窗口：序号从 1 开始，与 State 中的 llm_classify_files 一致
+    batch_files = video_files[offset:offset + _LLM_MAX_FILES]
+    batch_end = offset + len(batch_files)
+    
     # 构建文件列表
-    file_list_text = _build_file_list_text(scanned_files)
+    file_list_text = _build_file_list_text(batch_files)
+    if len(batch_files) < len(video_files):
+        file_list_text += (
+            f"\n\n⚠️ 共 {len(video_files)} 个视频，本次只对第 {offset + 1}-{batch_end} 个分类"
+        )
+        if batch_end < len(video_files):
+            file_list_text += (
+                f"；本批分类并整理完成后，用 offset={batch_end} 再次调用本工具处理剩余 "
+                f"{len(video_files) - batch_end} 个"
+            )
     
     # 构建 TMDB 信息
     tmdb_info_text = _build_tmdb_info_text(tmdb_ids)
@@ -152,7 +261,7 @@ def prepare_llm_classification(
     # 生成分类提示（使用 CSV 格式，更紧凑）
     output = f"""# 🎬 LLM 分类数据
 
-## 文件列表 ({len(video_files)} 个视频)
+## 文件列表 ({len(batch_files)} 个视频)
 
 {file_list_text}
 
@@ -202,15 +311,17 @@ unmatched:file_index,reason
 """
     
     # 保存文件列表到 state，供后续使用
-    # 🔥 使用 Pydantic 模型，然后 model_dump() 序列化
+    # 🔥 字段与 LLMClassifyFileItem 一致；数据来自可信的 scanned_files，
+    # 直接构建 dict，省去逐个模型验证 + model_dump() 的开销
+    # 🔥 LLM 只看得到本批文件，窗口之外的不可能被引用，不写入 State
     file_list_for_state = [
-        LLMClassifyFileItem(
-            index=i,
-            name=f.name,
-            path=f.path,
-            directory=f.directory or ""
-        ).model_dump()
-        for i, f in enumerate(video_files, 1)
+        {
+            "index": i,
+            "name": f.name,
+            "path": f.path,
+            "directory": f.directory or "",
+        }
+        for i, f in enumerate(batch_files, 1)
     ]
     
     return make_tool_response(
@@ -240,10 +351,14 @@ def _parse_csv_classification(csv_data: str) -> tuple:
     classifications = []
     unmatched = []
     
-    lines = csv_data.strip().split('\n')
-    in_unmatched = False
+    # 先按行筛掉空行/注释/表头/代码块标记，并按所在部分分组；
+    # 之后每行单独交给 csv.reader 切分（能正确处理带引号的字段），
+    # 某行引号没闭合时只影响这一行，不会把后面的行吞进同一个字段
+    classify_rows = []
+    unmatched_rows = []
+    rows = classify_rows
     
-    for line in lines:
+    for line in csv_data.strip().split('\n'):
         line = line.strip()
         
         # 跳过空行和注释
@@ -253,54 +368,59 @@ def _parse_csv_classification(csv_data: str) -> tuple:
         # 跳过表头
         if line.startswith('file_index,') or line.startswith('unmatched:file_index'):
             if 'unmatched' in line.lower():
-                in_unmatched = True
+                rows = unmatched_rows
             continue
         
-        # 检测 unmatched 部分开始
-        if line.lower().startswith('unmatched'):
-            in_unmatched = True
+        # 检测 unmatched 部分开始（只取前缀转小写，不复制整行）
+        if line[:9].lower() == 'unmatched':
+            rows = unmatched_rows
             continue
         
         # 跳过 markdown 代码块标记
         if line.startswith('```'):
             continue
         
-        parts = line.split(',')
+        rows.append(line)
+    
+    # 解析 unmatched: file_index,reason
+    for line in unmatched_rows:
+        parts = next(csv.reader([line]), None)
+        if not parts:
+            continue
+        try:
+            file_index = int(parts[0])
+        except ValueError:
+            continue
+        reason = parts[1].strip() if len(parts) > 1 else "未知原因"
+        unmatched.append({
+            'file_index': file_index,
+            'reason': reason
+        })
+    
+    # 格式: file_index,tmdb_id,type,season,episode (5 列)
+    # int() 本身会忽略首尾空白，不必逐个 strip
+    for line in classify_rows:
+        parts = next(csv.reader([line]), None)
+        if not parts or len(parts) < 5:
+            continue
+        try:
+            file_index = int(parts[0])
+            tmdb_id = int(parts[1])
+            season = int(parts[3])
+            episode = int(parts[4])
+        except ValueError:
+            continue
         
-        if in_unmatched:
-            # 解析 unmatched: file_index,reason
-            if len(parts) >= 1:
-                try:
-                    file_index = int(parts[0].strip())
-                    reason = parts[1].strip() if len(parts) > 1 else "未知原因"
-                    unmatched.append({
-                        'file_index': file_index,
-                        'reason': reason
-                    })
-                except ValueError:
-                    continue
-        else:
-            # 格式: file_index,tmdb_id,type,season,episode (5 列)
-            if len(parts) >= 5:
-                try:
-                    file_index = int(parts[0].strip())
-                    tmdb_id = int(parts[1].strip())
-                    type_val = parts[2].strip()
-                    season = int(parts[3].strip())
-                    episode = int(parts[4].strip())
-                    
-                    # type: 0=TV, 1=Movie
-                    media_type = 'movie' if type_val == '1' else 'tv'
-                    
-                    classifications.append({
-                        'file_index': file_index,
-                        'tmdb_id': tmdb_id,
-                        'media_type': media_type,
-                        'season': season,
-                        'episode': episode
-                    })
-                except ValueError:
-                    continue
+        # type: 0=TV, 1=Movie
+        media_type = 'movie' if parts[2].strip() == '1' else 'tv'
+        
+        classifications.append({
+            'file_index': file_index,
+            'tmdb_id': tmdb_id,
+            'media_type': media_type,
+            'season': season,
+            'episode': episode
+        })
     
     return classifications, unmatched
 
@@ -308,6 +428,7 @@ def _parse_csv_classification(csv_data: str) -> tuple:
 @tool
 def generate_classification(
     classifications_csv: str,
+    config: RunnableConfig = None,
     state: Annotated[dict, InjectedState] = None,
 ) -> str:
     """
@@ -350,8 +471,8 @@ def generate_classification(
     if not file_list:
         return make_tool_response("❌ 请先调用 prepare_llm_classification")
     
-    # 🔥 使用 Pydantic 验证文件列表
-    file_list_validated = [LLMClassifyFileItem.model_validate(f) for f in file_list]
+    # 🔥 文件列表由 prepare_llm_classification 写入 State，可信，跳过验证
+    file_list_validated = [LLMClassifyFileItem.from_trusted(f) for f in file_list]
     
     # 🔥 解析 CSV 格式的分类结果
     try:
@@ -363,17 +484,26 @@ def generate_classification(
     if not classifications_list:
         return make_tool_response("❌ 分类结果为空")
     
-    # 构建文件索引（使用验证后的 Pydantic 对象）
-    file_index_map = {f.index: f for f in file_list_validated}
+    # 文件索引由 prepare_llm_classification 按 enumerate(..., 1) 顺序写入，
+    # 序号 i 的文件就在 file_list_validated[i - 1]，直接按下标取，不另建 dict
+    file_count = len(file_list_validated)
     
     # 解析原始扫描文件（用于获取字幕）
-    scanned_files = _parse_scanned_files(scanned_files_data)
-    subtitle_files = [f for f in scanned_files if f.type == 'subtitle']
+    subtitle_files = _parse_subtitle_files(scanned_files_data, _get_thread_id(config))
+    
+    # 字幕只会匹配同目录的视频：只为已分类视频所在目录的字幕建索引，
+    # 其他目录的字幕（LLM 未分类或未列出的部分）不必提取 base_name
+    classified_dirs = {
+        file_list_validated[cls_item['file_index'] - 1].directory
+        for cls_item in classifications_list
+        if 1 <= cls_item['file_index'] <= file_count
+    }
     
     # 构建字幕索引（使用正确的 base_name 提取函数）
-    from collections import defaultdict
     subtitle_index = defaultdict(list)
     for sub in subtitle_files:
+        if sub.directory not in classified_dirs:
+            continue
         base_name = _get_base_name(sub.name)
         subtitle_index[(sub.directory, base_name)].append(sub)
     
@@ -391,18 +521,19 @@ def generate_classification(
             tmdb_media_types[tmdb_id] = MediaType.MOVIE if media_type_str == 'movie' else MediaType.TV
     
     # 获取 TMDB 信息（根据 LLM 指定的媒体类型）
-    tmdb = get_tmdb_service()
     tmdb_info_cache = {}
     
-    for tmdb_id in tmdb_ids:
+    def _fetch_details(tmdb_id: int):
         # 🔥 根据 LLM 指定的媒体类型获取信息
+        is_movie = tmdb_media_types.get(tmdb_id, MediaType.TV) == MediaType.MOVIE
+        return _get_tmdb_details(tmdb_id, is_movie)
+    
+    # 各 ID 的详情请求互不依赖，并行发出
+    details = _fetch_concurrently(_fetch_details, tmdb_ids)
+    
+    for tmdb_id, info in zip(tmdb_ids, details):
         media_type = tmdb_media_types.get(tmdb_id, MediaType.TV)
         
-        if media_type == MediaType.MOVIE:
-            info = tmdb.get_movie_details(tmdb_id)
-        else:
-            info = tmdb.get_tv_details(tmdb_id)
-        
         if info:
             tmdb_info_cache[tmdb_id] = {
                 "name": info.title_zh or info.title or f"TMDB:{tmdb_id}",
@@ -414,6 +545,8 @@ def generate_classification(
     
     # 构建分类结果
     classifications: Dict[int, Classification] = {}
+    # 各 tmdb_id 按季归档的文件数，构建时顺带累加，报告和前端结果直接复用
+    season_file_counts: Dict[int, int] = defaultdict(int)
     
     # 🔥 遍历 CSV 解析出的分类列表（dict 格式）
     for cls_item in classifications_list:
@@ -422,11 +555,11 @@ def generate_classification(
         season = cls_item['season']
         episode = cls_item['episode']
         
-        if file_idx not in file_index_map:
+        if not 1 <= file_idx <= file_count:
             continue
         
         # 🔥 file_info 是 LLMClassifyFileItem (Pydantic)
-        file_info = file_index_map[file_idx]
+        file_info = file_list_validated[file_idx - 1]
         
         # 初始化分类结构
         if tmdb_id not in classifications:
@@ -457,14 +590,14 @@ def generate_classification(
             logger.info(f"🔍 文件 {file_idx}: name={file_name}, dir={file_dir}, base_name={base_name}")
             logger.info(f"🔍 查找 key: ({file_dir}, {base_name})")
         
-        # 创建分类文件
-        classified_file = ClassifiedFile(
+        # 创建分类文件（字段均来自可信的 State 和已转成 int 的 CSV 值，跳过验证）
+        classified_file = ClassifiedFile.model_construct(
             path=file_info.path,
             name=file_name,
             episode=episode,
             season=season,
             subtitles=[
-                SubtitleFile(path=s.path, name=s.name, language=s.language or "und")
+                SubtitleFile.model_construct(path=s.path, name=s.name, language=s.language or "und")
                 for s in subs
             ]
         )
@@ -478,24 +611,25 @@ def generate_classification(
             if season not in classifications[tmdb_id].seasons:
                 classifications[tmdb_id].seasons[season] = []
             classifications[tmdb_id].seasons[season].append(classified_file)
+            season_file_counts[tmdb_id] += 1
     
-    # 生成报告
-    output = "# 📊 分类结果 (LLM 分类)\n\n"
-    output += f"**已分类**: {len(classifications_list)} 个文件\n\n"
+    # 生成报告（分段追加，最后一次 join，避免 += 反复复制整个字符串）
+    out = ["# 📊 分类结果 (LLM 分类)\n\n"]
+    out.append(f"**已分类**: {len(classifications_list)} 个文件\n\n")
     
     for tmdb_id, cls in classifications.items():
         # 🔥 根据媒体类型显示不同的图标
         icon = "🎬" if cls.type == MediaType.MOVIE else "📺"
-        output += f"### {icon} {cls.name} (TMDB:{tmdb_id})\n\n"
+        out.append(f"### {icon} {cls.name} (TMDB:{tmdb_id})\n\n")
         
         if cls.type == MediaType.MOVIE:
             # 电影：显示文件数
-            total_files = len(cls.files) + sum(len(files) for files in cls.seasons.values())
-            output += f"**文件数: {total_files}**\n\n"
+            total_files = len(cls.files) + season_file_counts[tmdb_id]
+            out.append(f"**文件数: {total_files}**\n\n")
         else:
             # TV：显示季和集数
-            output += "| 季 | 文件数 | 集数范围 |\n"
-            output += "|---|--------|----------|\n"
+            out.append("| 季 | 文件数 | 集数范围 |\n")
+            out.append("|---|--------|----------|\n")
             
             total_files = 0
             for season_num in sorted(cls.seasons.keys()):
@@ -503,70 +637,40 @@ def generate_classification(
                 if files:
                     eps = sorted([f.episode for f in files if f.episode > 0])
                     if eps:
-                        output += f"| S{season_num:02d} | {len(files)} | E{eps[0]:02d}-E{eps[-1]:02d} |\n"
+                        out.append(f"| S{season_num:02d} | {len(files)} | {format_ep_range(eps[0], eps[-1])} |\n")
                     else:
-                        output += f"| S{season_num:02d} | {len(files)} | - |\n"
+                        out.append(f"| S{season_num:02d} | {len(files)} | - |\n")
                     total_files += len(files)
             
-            output += f"\n**小计: {total_files} 个文件**\n\n"
+            out.append(f"\n**小计: {total_files} 个文件**\n\n")
     
     # 未匹配文件
     if unmatched_list:
-        output += f"## ⚠️ 未匹配文件: {len(unmatched_list)} 个\n\n"
+        out.append(f"## ⚠️ 未匹配文件: {len(unmatched_list)} 个\n\n")
         for item in unmatched_list[:10]:
             # 🔥 item 是 dict（从 CSV 解析）
             file_idx = item['file_index']
             reason = item.get('reason', '未知原因')
-            file_info = file_index_map.get(file_idx)
+            file_info = file_list_validated[file_idx - 1] if 1 <= file_idx <= file_count else None
             file_name = file_info.name if file_info else f'文件{file_idx}'
-            output += f"- {file_name}: {reason}\n"
+            out.append(f"- {file_name}: {reason}\n")
         if len(unmatched_list) > 10:
-            output += f"- ... 还有 {len(unmatched_list) - 10} 个\n"
-        output += "\n"
+            out.append(f"- ... 还有 {len(unmatched_list) - 10} 个\n")
+        out.append("\n")
     
     # 下一步提示
-    output += "---\n\n"
-    output += "## 🎯 下一步\n\n"
-    output += "请选择操作：\n"
-    output += "- **执行 STRM**: `connect_strm_target` → `generate_strm`\n"
-    output += "- **执行传统整理**: `organize_files`\n"
-    output += "- **重新分类**: 告诉我需要调整的地方\n"
-    
-    # 转换为可序列化格式
-    def _classification_to_dict(cls: Classification) -> Dict:
-        return {
-            "tmdb_id": cls.tmdb_id,
-            "name": cls.name,
-            "type": cls.type.value if hasattr(cls.type, 'value') else str(cls.type),
-            "year": cls.year,
-            "genres": cls.genres,
-            "sub_category": cls.sub_category.value if hasattr(cls.sub_category, 'value') else str(cls.sub_category),
-            "seasons": {
-                k: [
-                    {
-                        "path": f.path,
-                        "name": f.name,
-                        "episode": f.episode,
-                        "season": f.season,
-                        "subtitles": [{"path": s.path, "name": s.name, "language": s.language} for s in f.subtitles]
-                    }
-                    for f in v
-                ]
-                for k, v in cls.seasons.items()
-            },
-            "files": [
-                {
-                    "path": f.path,
-                    "name": f.name,
-                    "episode": f.episode,
-                    "season": f.season,
-                    "subtitles": [{"path": s.path, "name": s.name, "language": s.language} for s in f.subtitles]
-                }
-                for f in cls.files
-            ]
-        }
-    
-    classifications_list = [_classification_to_dict(cls) for cls in classifications.values()]
+    out.append("---\n\n")
+    out.append("## 🎯 下一步\n\n")
+    out.append("请选择操作：\n")
+    out.append("- **执行 STRM**: `connect_strm_target` → `generate_strm`\n")
+    out.append("- **执行传统整理**: `organize_files`\n")
+    out.append("- **重新分类**: 告诉我需要调整的地方\n")
+    output = "".join(out)
+    
+    # 转换为可序列化格式（整棵模型树交给 pydantic-core，枚举输出为值）
+    classifications_list = _CLASSIFICATION_LIST_ADAPTER.dump_python(
+        list(classifications.values()), mode="json"
+    )
     
     # 构建前端期望的 classification_result 格式（按季显示）
     classification_result = {}
@@ -574,7 +678,7 @@ def generate_classification(
         logger.info(f"🔍 构建 classification_result: tmdb_id={tmdb_id}, type={cls.type}, name={cls.name}")
         if cls.type == MediaType.MOVIE:
             # 🔥 电影类型
-            total_files = len(cls.files) + sum(len(files) for files in cls.seasons.values())
+            total_files = len(cls.files) + season_file_counts[tmdb_id]
             try:
                 item = ClassificationResultItem(
                     name=cls.name,
@@ -589,7 +693,7 @@ def generate_classification(
                 raise
         else:
             # 🔥 TV 类型
-            total_files = sum(len(files) for files in cls.seasons.values())
+            total_files = season_file_counts[tmdb_id]
             
             # 按季构建详情
             seasons_info = []
@@ -598,7 +702,7 @@ def generate_classification(
                 eps = [f.episode for f in files if f.episode > 0]
                 if eps:
                     all_eps.extend(eps)
-                    season_ep_range = f"E{min(eps):02d}-E{max(eps):02d}"
+                    season_ep_range = format_ep_range(min(eps), max(eps))
                     seasons_info.append(SeasonInfo(
                         season=season_num,
                         episode_count=len(eps),
@@ -606,7 +710,7 @@ def generate_classification(
                     ))
             
             # 兼容旧版的 ep_range（所有季的 min-max）
-            ep_range = f"E{min(all_eps):02d}-E{max(all_eps):02d}" if all_eps else "-"
+            ep_range = format_ep_range(min(all_eps), max(all_eps)) if all_eps else "-"
             
             try:
                 item = ClassificationResultItem(
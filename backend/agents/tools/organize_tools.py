@@ -22,7 +22,9 @@
 
 import os
 import logging
-from typing import Dict, Any, List, Annotated
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Set, Tuple, Annotated
 from langchain.tools import tool
 from langgraph.prebuilt import InjectedState
 
@@ -31,20 +33,35 @@ from backend.agents.services import get_storage_service
 from backend.agents.tool_response import make_tool_response
 from backend.services.tmdb_service import get_tmdb_service
 from backend.utils.naming import (
-    format_episode_name,
-    format_movie_name,
+    sanitize_filename,
     format_series_folder,
     format_season_folder,
     format_movie_folder,
 )
 from backend.agents.models import (
-    MediaType, SubCategory, determine_subcategory, get_subcategory_name, SubtitleFile,
+    MediaType, determine_subcategory, get_subcategory_name, SubtitleFile,
     Classification, ClassifiedFile
 )
 from backend.utils.path_utils import get_target_path
 
 logger = logging.getLogger(__name__)
 
+# 文件移动/复制并发数（每次操作都是一次阻塞的网络往返，多个文件并行发出）
+_TRANSFER_WORKERS = 8
+
+# 正在整理的 (存储地址, 目标路径)，防止同一目标被并发整理（后端为单进程，进程内加锁即可）
+_active_runs: Set[Tuple[str, str]] = set()
+_active_runs_lock = threading.Lock()
+
+# 返回给 LLM 的整理报告中各系列明细的字符上限（超出的系列只计入总计并写日志）
+_REPORT_MAX_CHARS = 64 * 1024
+
+# 每批失败汇总日志中列出的样例数
+_LOG_FAILURE_SAMPLES = 3
+
+# 单个视频的整理任务：(视频源路径, 视频目标路径, 默认字幕复制 (源, 目标) 或 None, 字幕移动 [(源, 目标)])
+TransferJob = Tuple[str, str, Optional[Tuple[str, str]], List[Tuple[str, str]]]
+
 
 # 🔥 字幕语言优先级（用于选择默认字幕）
 SUBTITLE_LANGUAGE_PRIORITY = [
@@ -55,131 +72,207 @@ SUBTITLE_LANGUAGE_PRIORITY = [
     'und',                         # 未知
 ]
 
+# 语言 → 优先级序号（查表代替 list.index 线性查找）
+_SUB_LANG_RANK = {lang: i for i, lang in enumerate(SUBTITLE_LANGUAGE_PRIORITY)}
+
 
 def _get_language_priority(lang: str) -> int:
-    """获取语言优先级（数字越小优先级越高）"""
-    lang_lower = lang.lower() if lang else 'und'
-    try:
-        return SUBTITLE_LANGUAGE_PRIORITY.index(lang_lower)
-    except ValueError:
-        return 999  # 未知语言放最后
+    """获取语言优先级（数字越小优先级越高，未知语言放最后）"""
+    # 扫描时已规范为小写语言码（空值补 und），先直接查表，查不到再规范化
+    rank = _SUB_LANG_RANK.get(lang)
+    if rank is not None:
+        return rank
+    return _SUB_LANG_RANK.get(lang.lower() if lang else 'und', 999)
 
 
-def _select_default_subtitle(subtitles: list) -> SubtitleFile:
-    """根据优先级选择默认字幕
+def _format_subtitle_name(stem: str, sub: SubtitleFile, is_default: bool = False) -> str:
+    """格式化字幕文件名
+    
+    stem 为视频文件名去掉扩展名的部分（TV: 系列名.Sxx.Exx，电影: 电影名.年份），
+    由调用方按 format_episode_name / format_movie_name 的规则预先算好，同一视频的字幕共用。
+    例如: SeriesA.S01.E01.chs.srt / MovieA.2011.chs.srt
     
     Args:
-        subtitles: 字幕文件列表
+        stem: 视频文件名主体
+        sub: 字幕文件
+        is_default: 是否为默认字幕（不带语言标识）
+    """
+    ext = os.path.splitext(sub.name)[1].lower()  # .srt, .ass, .ssa
+    
+    if is_default:
+        # 🔧 与视频文件名一致：stem.ext
+        return f"{stem}{ext}"
+    lang = sub.language or "und"
+    # 🔧 与视频文件名一致：stem.lang.ext
+    return f"{stem}.{lang}{ext}"
+
+
+def _build_transfer_job(cf: ClassifiedFile, dir_path: str, stem: str) -> TransferJob:
+    """生成单个视频及其字幕的整理任务（目标文件名均以 stem 为主体）"""
+    ext = os.path.splitext(cf.name)[1]
+    new_path = f"{dir_path}/{stem}{ext}"
+    
+    # 🆕 处理关联的字幕文件：一次遍历同时生成移动任务、选出默认字幕
+    subtitles = cf.subtitles
+    # 只有一个字幕（最常见）时它就是默认字幕，不必比较优先级
+    default_sub = subtitles[0] if len(subtitles) == 1 else None
+    best_rank = 1000
+    sub_moves = []
+    for sub in subtitles:
+        # 🔥 默认字幕取优先级最高的（同优先级取第一个）
+        if default_sub is not sub:
+            rank = _get_language_priority(sub.language)
+            if rank < best_rank:
+                best_rank, default_sub = rank, sub
+        # 🔥 所有带语言标识的字幕
+        sub_moves.append((sub.path, f"{dir_path}/{_format_subtitle_name(stem, sub)}"))
+    
+    default_copy = None
+    if default_sub is not None:
+        default_copy = (default_sub.path, f"{dir_path}/{_format_subtitle_name(stem, default_sub, is_default=True)}")
+    
+    return cf.path, new_path, default_copy, sub_moves
+
+
+def _transfer_subtitles(service, job: TransferJob) -> Tuple[int, List[Tuple[str, str]]]:
+    """
+    整理单个视频的字幕（同一视频内按顺序执行：先复制默认字幕，再移动字幕）
+    
+    失败不在这里逐条写日志，由 _run_transfers 汇总后统一输出。
     
     Returns:
-        优先级最高的字幕
+        (字幕成功数, 失败列表 [(源路径, 错误)])
     """
-    if not subtitles:
-        return None
+    _, _, default_sub, sub_moves = job
+    sub_success = 0
+    failures: List[Tuple[str, str]] = []
+    
+    # 🔥 先复制默认字幕（必须在移走原字幕之前）
+    if default_sub:
+        try:
+            service.copy_file(*default_sub)
+            sub_success += 1
+        except Exception as e:
+            failures.append((default_sub[0], f"默认字幕复制失败: {e}"))
     
-    return min(subtitles, key=lambda s: _get_language_priority(s.language))
+    # 🔥 再移动所有带语言标识的字幕
+    for sub_src, sub_dst in sub_moves:
+        try:
+            service.move_file(sub_src, sub_dst)
+            sub_success += 1
+        except Exception as e:
+            failures.append((sub_src, f"字幕整理失败: {e}"))
+    
+    return sub_success, failures
 
 
-def _format_subtitle_name(title: str, season: int, episode: int, sub: SubtitleFile, is_default: bool = False) -> str:
-    """格式化字幕文件名 (TV)
-    
-    格式: 系列名.Sxx.Exx.语言.扩展名（与视频文件 format_episode_name 一致）
-    例如: SeriesA.S01.E01.chs.srt
+def _group_subtitle_jobs(jobs: List[TransferJob]) -> List[List[TransferJob]]:
+    """
+    按可能冲突的临时文件给字幕任务分组（组内串行，组间可并行）
     
-    Args:
-        title: 系列名
-        season: 季号
-        episode: 集号
-        sub: 字幕文件
-        is_default: 是否为默认字幕（不带语言标识）
+    Alist 的复制/跨目录移动会先落到 {目标目录}/{源文件名} 再重命名，
+    不同来源目录的同名字幕（如 SC/01.ass 与 TC/01.ass）进入同一目标目录时会互相覆盖，
+    这类任务必须放进同一组按顺序执行。组内保持原有顺序。
     """
-    from backend.utils.naming import sanitize_filename
-    clean_title = sanitize_filename(title)
-    ext = os.path.splitext(sub.name)[1].lower()  # .srt, .ass, .ssa
+    # 并查集：共用 (目标目录, 源文件名) 的任务合并到同一组
+    parent = list(range(len(jobs)))
     
-    if is_default:
-        # 🔧 与 format_episode_name 格式一致：系列名.Sxx.Exx.ext
-        return f"{clean_title}.S{season:02d}.E{episode:02d}{ext}"
-    else:
-        lang = sub.language or "und"
-        # 🔧 与 format_episode_name 格式一致：系列名.Sxx.Exx.lang.ext
-        return f"{clean_title}.S{season:02d}.E{episode:02d}.{lang}{ext}"
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    owners: Dict[Tuple[str, str], int] = {}
+    for i, (_, _, default_sub, sub_moves) in enumerate(jobs):
+        transfers = [default_sub, *sub_moves] if default_sub else sub_moves
+        for src, dst in transfers:
+            key = (os.path.dirname(dst), os.path.basename(src))
+            owner = owners.setdefault(key, i)
+            if owner != i:
+                parent[find(i)] = find(owner)
+    
+    groups: Dict[int, List[TransferJob]] = {}
+    for i, job in enumerate(jobs):
+        groups.setdefault(find(i), []).append(job)
+    return list(groups.values())
 
 
-def _format_movie_subtitle_name(title: str, year: int, sub: SubtitleFile, is_default: bool = False) -> str:
-    """格式化字幕文件名 (电影)
+def _run_transfers(service, jobs: List[TransferJob], label: str) -> Tuple[int, int, int, int]:
+    """
+    执行一批整理任务（调用前目标目录须已创建）
     
-    格式: 电影名.年份.语言.扩展名（与视频文件 format_movie_name 一致）
-    例如: MovieA.2011.chs.srt
+    视频整批交给 move_files_batch（后端可合并请求），字幕按 _group_subtitle_jobs 分组后组间并行。
+    本批的失败汇总成一条日志（label 标明是哪一季/哪部电影），避免大量失败时逐条写日志。
     
-    Args:
-        title: 电影名
-        year: 年份
-        sub: 字幕文件
-        is_default: 是否为默认字幕（不带语言标识）
+    Returns:
+        (视频成功数, 视频失败数, 字幕成功数, 字幕失败数)
     """
-    from backend.utils.naming import sanitize_filename
-    clean_title = sanitize_filename(title)
-    clean_title = clean_title.replace(' ', '.')  # 与 format_movie_name 一致
-    ext = os.path.splitext(sub.name)[1].lower()
+    if not jobs:
+        return 0, 0, 0, 0
     
-    if is_default:
-        # 🔧 与 format_movie_name 格式一致：电影名.年份.ext
-        if year:
-            return f"{clean_title}.{year}{ext}"
-        return f"{clean_title}{ext}"
+    video_results = service.move_files_batch(
+        [(job[0], job[1]) for job in jobs], concurrency=_TRANSFER_WORKERS
+    )
+    failures = [
+        (job[0], f"视频整理失败: {error}")
+        for job, (ok, error) in zip(jobs, video_results) if not ok
+    ]
+    
+    def transfer_group(group: List[TransferJob]) -> List[Tuple[int, List[Tuple[str, str]]]]:
+        return [_transfer_subtitles(service, job) for job in group]
+    
+    sub_groups = _group_subtitle_jobs([job for job in jobs if job[2] or job[3]])
+    if len(sub_groups) <= 1:
+        group_results = [transfer_group(group) for group in sub_groups]
     else:
-        lang = sub.language or "und"
-        # 🔧 与 format_movie_name 格式一致：电影名.年份.lang.ext
-        if year:
-            return f"{clean_title}.{year}.{lang}{ext}"
-        return f"{clean_title}.{lang}{ext}"
+        with ThreadPoolExecutor(max_workers=min(_TRANSFER_WORKERS, len(sub_groups))) as executor:
+            group_results = list(executor.map(transfer_group, sub_groups))
+    sub_results = [result for results in group_results for result in results]
+    
+    sub_error = 0
+    for _, sub_failures in sub_results:
+        sub_error += len(sub_failures)
+        failures.extend(sub_failures)
+    
+    if failures:
+        logger.error(f"{label}: {len(failures)} 个文件整理失败，前几个: {failures[:_LOG_FAILURE_SAMPLES]}")
+    
+    video_success = sum(ok for ok, _ in video_results)
+    return (
+        video_success,
+        len(jobs) - video_success,
+        sum(r[0] for r in sub_results),
+        sub_error,
+    )
+
+
+def _ensure_directory(service, path: str, known_dirs: set):
+    """
+    确保目录存在（含父目录），同一次整理中每个目录只请求一次
+
+    WebDAV 的 MKCOL 不会自动创建父目录，所以先逐级确保父目录；
+    已在 known_dirs 中的目录（包括根路径）直接跳过，不再发网络请求。
+    """
+    if not path or path in known_dirs:
+        return
+    parent = path.rsplit('/', 1)[0]
+    if parent:
+        _ensure_directory(service, parent, known_dirs)
+    try:
+        service.create_directory(path)
+    except Exception:
+        pass  # 目录已存在等错误忽略
+    known_dirs.add(path)
 
 
 def _parse_classifications(classifications_data: List[Dict[str, Any]]) -> Dict[int, Classification]:
-    """从 State 中解析 classifications 数据为 Pydantic 模型"""
-    result = {}
-    for cls_dict in classifications_data:
-        tmdb_id = cls_dict.get("tmdb_id")
-        if tmdb_id:
-            # 解析 seasons
-            seasons = {}
-            for season_num, files_data in cls_dict.get("seasons", {}).items():
-                season_files = []
-                for f in files_data:
-                    subtitles = [SubtitleFile(**s) for s in f.get("subtitles", [])]
-                    season_files.append(ClassifiedFile(
-                        path=f["path"],
-                        name=f["name"],
-                        episode=f.get("episode", 0),
-                        season=f.get("season", 0),
-                        subtitles=subtitles
-                    ))
-                seasons[int(season_num)] = season_files
-            
-            # 解析 files (for movies)
-            files = []
-            for f in cls_dict.get("files", []):
-                subtitles = [SubtitleFile(**s) for s in f.get("subtitles", [])]
-                files.append(ClassifiedFile(
-                    path=f["path"],
-                    name=f["name"],
-                    episode=f.get("episode", 0),
-                    season=f.get("season", 0),
-                    subtitles=subtitles
-                ))
-            
-            result[tmdb_id] = Classification(
-                tmdb_id=tmdb_id,
-                name=cls_dict.get("name", ""),
-                type=MediaType(cls_dict.get("type", "tv")),
-                year=cls_dict.get("year"),
-                genres=cls_dict.get("genres", []),
-                sub_category=SubCategory(cls_dict.get("sub_category", "default")),
-                seasons=seasons,
-                files=files
-            )
-    return result
+    """从 State 中解析 classifications 数据为 Pydantic 模型（可信数据，跳过验证）"""
+    return {
+        cls_dict["tmdb_id"]: Classification.from_trusted(cls_dict)
+        for cls_dict in classifications_data
+        if cls_dict.get("tmdb_id")
+    }
 
 
 @tool
@@ -235,15 +328,44 @@ def organize_files(
     # 使用 user_config 中的配置（如果未传参）
     effective_language = naming_language or user_config.get("naming_language") or "zh"
     
+    # 同一目标路径同时只允许一个整理任务（重试/重复触发时避免两次移动同一批文件）
+    run_key = (storage_config.get("url", ""), target_path)
+    with _active_runs_lock:
+        if run_key in _active_runs:
+            return make_tool_response("❌ 该目标路径正在整理中，请等待当前任务完成")
+        _active_runs.add(run_key)
+    
+    try:
+        return _organize_classifications(service, classifications, target_path, effective_language)
+    finally:
+        with _active_runs_lock:
+            _active_runs.discard(run_key)
+
+
+def _organize_classifications(
+    service,
+    classifications: Dict[int, Classification],
+    target_path: str,
+    effective_language: str,
+) -> str:
+    """执行整理并生成报告（organize_files 的主体，调用方已持有该目标路径的运行标记）"""
     tmdb = get_tmdb_service()
     
-    output = "## 📁 整理文件\n\n"
-    output += f"📂 输出路径: `{target_path}` (自动子分类)\n"
-    output += f"- 模式: **移动** (原文件将被移走)\n"
-    output += f"- 命名语言: {effective_language}\n\n"
+    # 报告分段收集，最后一次性拼接
+    parts = [
+        "## 📁 整理文件\n\n",
+        f"📂 输出路径: `{target_path}` (自动子分类)\n",
+        "- 模式: **移动** (原文件将被移走)\n",
+        f"- 命名语言: {effective_language}\n\n",
+    ]
     
     total_success = 0
     total_error = 0
+    report_size = 0
+    omitted_sections = 0
+    
+    # 本次已确保存在的目录（target_path 视为已存在，不再向上创建）
+    known_dirs = {target_path.rstrip('/') or '/'}
     
     # 遍历所有分类的系列（使用 Pydantic 模型）
     for tmdb_id, cls in classifications.items():
@@ -281,7 +403,8 @@ def organize_files(
         # 获取子分类显示名称
         sub_name = get_subcategory_name(sub_category, series_type, effective_language)
         
-        output += f"### 📺 {title} (TMDB:{tmdb_id}) - {sub_name}\n\n"
+        # 本系列的报告段落（超出报告上限时只写日志）
+        section = [f"### 📺 {title} (TMDB:{tmdb_id}) - {sub_name}\n\n"]
         
         if series_type == MediaType.TV:
             # TV 系列：按季整理
@@ -291,80 +414,36 @@ def organize_files(
             category_path = get_target_path(target_path, MediaType.TV, sub_category, effective_language)
             series_path = f"{category_path}/{series_folder}"
             
-            # 创建系列目录
-            try:
-                service.create_directory(series_path)
-            except Exception:
-                pass
+            # 文件名中的标题每个系列只清理一次（与 format_episode_name 规则一致）
+            clean_title = sanitize_filename(title)
             
             for season_num in sorted(cls.seasons.keys()):
                 files = cls.seasons[season_num]  # List[ClassifiedFile]
                 season_folder = format_season_folder(season_num)
                 season_path = f"{series_path}/{season_folder}"
                 
-                # 创建季目录
-                try:
-                    service.create_directory(season_path)
-                except Exception:
-                    pass
+                # 创建季目录（系列目录、分类目录随之确保，只创建一次）
+                _ensure_directory(service, season_path, known_dirs)
                 
-                season_success = 0
-                season_error = 0
+                # 先在主线程生成所有目标路径，再并行执行移动/复制
+                season_prefix = f"{clean_title}.S{season_num:02d}"
+                jobs: List[TransferJob] = [
+                    _build_transfer_job(cf, season_path, f"{season_prefix}.E{cf.episode:02d}")
+                    for cf in files
+                    if cf.episode > 0
+                ]
                 
-                season_subtitle_success = 0
-                season_subtitle_error = 0
+                (season_success, season_error,
+                 season_subtitle_success, season_subtitle_error) = _run_transfers(service, jobs, f"{title} S{season_num:02d}")
                 
-                for cf in files:
-                    episode = cf.episode
-                    if episode <= 0:
-                        continue
-                    
-                    # 视频文件
-                    ext = os.path.splitext(cf.name)[1]
-                    new_name = format_episode_name(title, season_num, episode, ext)
-                    new_path = f"{season_path}/{new_name}"
-                    
-                    try:
-                        service.move_file(cf.path, new_path)
-                        season_success += 1
-                    except Exception as e:
-                        logger.error(f"整理失败 {cf.path}: {e}")
-                        season_error += 1
-                    
-                    # 🆕 处理关联的字幕文件
-                    if cf.subtitles:
-                        # 🔥 先复制默认字幕（根据优先级选择）
-                        default_sub = _select_default_subtitle(cf.subtitles)
-                        if default_sub:
-                            default_sub_name = _format_subtitle_name(title, season_num, episode, default_sub, is_default=True)
-                            default_sub_path = f"{season_path}/{default_sub_name}"
-                            try:
-                                service.copy_file(default_sub.path, default_sub_path)
-                                season_subtitle_success += 1
-                            except Exception as e:
-                                logger.error(f"默认字幕复制失败 {default_sub.path}: {e}")
-                                season_subtitle_error += 1
-                        
-                        # 🔥 再移动所有带语言标识的字幕
-                        for sub in cf.subtitles:
-                            sub_new_name = _format_subtitle_name(title, season_num, episode, sub, is_default=False)
-                            sub_new_path = f"{season_path}/{sub_new_name}"
-                            
-                            try:
-                                service.move_file(sub.path, sub_new_path)
-                                season_subtitle_success += 1
-                            except Exception as e:
-                                logger.error(f"字幕整理失败 {sub.path}: {e}")
-                                season_subtitle_error += 1
-                
-                output += f"- S{season_num:02d}: {season_success} 成功"
+                section.append(f"- S{season_num:02d}: {season_success} 成功")
                 if season_subtitle_success > 0:
-                    output += f" (+{season_subtitle_success} 字幕)"
+                    section.append(f" (+{season_subtitle_success} 字幕)")
                 if season_error > 0:
-                    output += f", {season_error} 失败"
+                    section.append(f", {season_error} 失败")
                 if season_subtitle_error > 0:
-                    output += f" ({season_subtitle_error} 字幕失败)"
-                output += "\n"
+                    section.append(f" ({season_subtitle_error} 字幕失败)")
+                section.append("\n")
                 
                 total_success += season_success
                 total_error += season_error
@@ -378,68 +457,47 @@ def organize_files(
             category_path = get_target_path(target_path, MediaType.MOVIE, sub_category, effective_language)
             movie_full_path = f"{category_path}/{movie_folder}"
             
-            try:
-                service.create_directory(movie_full_path)
-            except Exception:
-                pass
+            _ensure_directory(service, movie_full_path, known_dirs)
             
-            movie_subtitle_success = 0
-            movie_subtitle_error = 0
+            # 先在主线程生成所有目标路径，再并行执行移动/复制
+            # 文件名主体与 format_movie_name 规则一致：电影名（空格换成点）.年份
+            movie_stem = sanitize_filename(title).replace(' ', '.')
+            if year:
+                movie_stem = f"{movie_stem}.{year}"
+            jobs: List[TransferJob] = [_build_transfer_job(cf, movie_full_path, movie_stem) for cf in files]
             
-            for cf in files:
-                # 视频文件
-                ext = os.path.splitext(cf.name)[1]
-                new_name = format_movie_name(title, year, ext)
-                new_path = f"{movie_full_path}/{new_name}"
-                
-                try:
-                    service.move_file(cf.path, new_path)
-                    total_success += 1
-                except Exception as e:
-                    logger.error(f"整理失败 {cf.path}: {e}")
-                    total_error += 1
-                
-                # 🆕 处理关联的字幕文件
-                if cf.subtitles:
-                    # 🔥 先复制默认字幕（根据优先级选择）
-                    default_sub = _select_default_subtitle(cf.subtitles)
-                    if default_sub:
-                        default_sub_name = _format_movie_subtitle_name(title, year, default_sub, is_default=True)
-                        default_sub_path = f"{movie_full_path}/{default_sub_name}"
-                        try:
-                            service.copy_file(default_sub.path, default_sub_path)
-                            movie_subtitle_success += 1
-                        except Exception as e:
-                            logger.error(f"默认字幕复制失败 {default_sub.path}: {e}")
-                            movie_subtitle_error += 1
-                    
-                    # 🔥 再移动所有带语言标识的字幕
-                    for sub in cf.subtitles:
-                        sub_new_name = _format_movie_subtitle_name(title, year, sub, is_default=False)
-                        sub_new_path = f"{movie_full_path}/{sub_new_name}"
-                        
-                        try:
-                            service.move_file(sub.path, sub_new_path)
-                            movie_subtitle_success += 1
-                        except Exception as e:
-                            logger.error(f"字幕整理失败 {sub.path}: {e}")
-                            movie_subtitle_error += 1
+            (movie_success, movie_error,
+             movie_subtitle_success, movie_subtitle_error) = _run_transfers(service, jobs, title)
+            total_success += movie_success
+            total_error += movie_error
             
-            output += f"- {len(files)} 个文件"
+            section.append(f"- {len(files)} 个文件")
             if movie_subtitle_success > 0:
-                output += f" (+{movie_subtitle_success} 字幕)"
+                section.append(f" (+{movie_subtitle_success} 字幕)")
             if movie_subtitle_error > 0:
-                output += f" ({movie_subtitle_error} 字幕失败)"
-            output += "\n"
+                section.append(f" ({movie_subtitle_error} 字幕失败)")
+            section.append("\n")
+        
+        section.append("\n")
         
-        output += "\n"
+        section_text = "".join(section)
+        if report_size + len(section_text) <= _REPORT_MAX_CHARS:
+            parts.append(section_text)
+            report_size += len(section_text)
+        else:
+            omitted_sections += 1
+            logger.info(f"整理报告（超出上限未返回）:\n{section_text}")
+    
+    if omitted_sections:
+        parts.append(f"⚠️ 报告过长，另有 {omitted_sections} 个系列的明细未列出（已写入日志）\n\n")
     
-    output += f"---\n**总计**\n"
-    output += f"- 成功: {total_success}\n"
+    parts.append("---\n**总计**\n")
+    parts.append(f"- 成功: {total_success}\n")
     if total_error > 0:
-        output += f"- 失败: {total_error}\n"
+        parts.append(f"- 失败: {total_error}\n")
     
-    output += "\n**注意**: 使用的是移动模式，原文件已被移走。\n"
+    parts.append("\n**注意**: 使用的是移动模式，原文件已被移走。\n")
+    output = "".join(parts)
     
     # 返回 ToolResponse JSON（清空分类数据）
     return make_tool_response(
@@ -20,6 +20,9 @@ from backend.agents.tool_response import make_tool_response
 from backend.services.tmdb_service import get_tmdb_service
 from backend.utils.infuse_formatter import InfuseFormatter
 
+# 格式化器无状态，模块内共用一个实例
+_FORMATTER = InfuseFormatter()
+
 
 @tool
 def preview_rename(
@@ -44,10 +47,10 @@ def preview_rename(
     """
     try:
         tmdb = get_tmdb_service()
-        formatter = InfuseFormatter()
+        is_tv = media_type == "tv"
         
-        # 获取详细信息
-        if media_type == "tv":
+        # 获取详细信息（TMDBService 内部带缓存）
+        if is_tv:
             info = tmdb.get_tv_details(tmdb_id)
         else:
             info = tmdb.get_movie_details(tmdb_id)
@@ -60,8 +63,8 @@ def preview_rename(
         ext = ext or ".mkv"
         
         # 生成Infuse规范的文件名
-        if media_type == "tv":
-            formatted = formatter.format_tv_episode(
+        if is_tv:
+            formatted = _FORMATTER.format_tv_episode(
                 series_title=info.title,
                 season=season,
                 episode=episode,
@@ -69,7 +72,7 @@ def preview_rename(
             )
             new_name = formatted.filename
         else:
-            formatted = formatter.format_movie(
+            formatted = _FORMATTER.format_movie(
                 title=info.title,
                 year=info.year,
                 extension=ext,
@@ -87,7 +90,7 @@ def preview_rename(
         result += f"• 标题: {info.title}\n"
         if info.year:
             result += f"• 年份: {info.year}\n"
-        if media_type == "tv":
+        if is_tv:
             result += f"• 季/集: S{season:02d}E{episode:02d}\n"
         result += f"• TMDB ID: {tmdb_id}\n"
         
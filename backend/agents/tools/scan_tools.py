@@ -9,11 +9,12 @@
 - 返回通用 JSON 格式：{"message": "...", "state_update": {...}}
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from typing_extensions import Annotated
 from collections import defaultdict
 import re
 import os
+import time
 from langchain.tools import tool
 from langgraph.prebuilt import InjectedState
 
@@ -21,6 +22,9 @@ from backend.agents.tool_response import make_tool_response
 from backend.agents.services import get_storage_service
 from backend.utils.file_filter import get_file_type
 
+# 并行列目录的线程数（列目录是纯网络等待，多个目录同时请求）
+_SCAN_WORKERS = 8
+
 # 全局变量用于实时进度跟踪
 _scan_progress = {
     "videos": 0,
@@ -30,6 +34,40 @@ _scan_progress = {
 }
 
 
+# 字幕扩展名（提取语言前去掉）
+_SUBTITLE_EXTS = frozenset({'srt', 'ass', 'ssa', 'sub'})
+
+# 🔥 复合语言直接保留（优先匹配）
+_COMPOUND_LANGS = ('scjp', 'tcjp', 'chsjp', 'chtjp', 'chs_jp', 'cht_jp')
+
+# 常见语言代码映射
+_LANG_MAP = {
+    # 简体中文
+    'chs': 'chs', 'chi': 'chs', 'sc': 'chs', 'gb': 'chs', 'zh-cn': 'chs', 'zho': 'chs',
+    # 繁体中文
+    'cht': 'cht', 'tc': 'cht', 'big5': 'cht', 'zh-tw': 'cht',
+    # 英文
+    'eng': 'eng', 'en': 'eng',
+    # 日文
+    'jpn': 'jpn', 'jap': 'jpn', 'jp': 'jpn', 'ja': 'jpn',
+    # 韩文
+    'kor': 'kor', 'ko': 'kor',
+}
+
+# 末尾语言标识 → 语言代码（复合语言映射为自身，与 _LANG_MAP 合并成一次查表）
+_TAIL_LANGS = {**{lang: lang for lang in _COMPOUND_LANGS}, **_LANG_MAP}
+
+# 文件名中间的语言标识，按匹配优先级排列：(标识, 语言代码, 标识本身是否含 "_")
+_MID_LANGS = tuple(
+    (pattern, lang, '_' in pattern)
+    for pattern, lang in [*((lang, lang) for lang in _COMPOUND_LANGS), *_LANG_MAP.items()]
+)
+
+# 扫描结果分组用：剧集 / 电影文件名模式
+_TV_NAME_RE = re.compile(r'^(.+?)\s*[\(\[]?(?:TV\s*)?S?(\d+).*?[\)\]]?\s*\.?\s*(\d+)', re.IGNORECASE)
+_MOVIE_NAME_RE = re.compile(r'^(.+?)\s*[\(\[]?(\d{4})[\)\]]?')
+
+
 def _extract_subtitle_language(filename: str) -> str:
     """从字幕文件名提取语言
     
@@ -46,44 +84,28 @@ def _extract_subtitle_language(filename: str) -> str:
         语言代码: chs, cht, eng, jpn, kor, scjp, tcjp, und 等
     """
     # 移除扩展名
-    name = re.sub(r'\.(srt|ass|ssa|sub)$', '', filename, flags=re.IGNORECASE)
-    
-    # 🔥 复合语言直接保留（优先匹配）
-    compound_langs = ['scjp', 'tcjp', 'chsjp', 'chtjp', 'chs_jp', 'cht_jp']
+    head, dot, ext = filename.rpartition('.')
+    name = head if dot and ext.lower() in _SUBTITLE_EXTS else filename
+    name_lower = name.lower()
     
-    # 常见语言代码映射
-    lang_map = {
-        # 简体中文
-        'chs': 'chs', 'chi': 'chs', 'sc': 'chs', 'gb': 'chs', 'zh-cn': 'chs', 'zho': 'chs',
-        # 繁体中文
-        'cht': 'cht', 'tc': 'cht', 'big5': 'cht', 'zh-tw': 'cht',
-        # 英文
-        'eng': 'eng', 'en': 'eng',
-        # 日文
-        'jpn': 'jpn', 'jap': 'jpn', 'jp': 'jpn', 'ja': 'jpn',
-        # 韩文
-        'kor': 'kor', 'ko': 'kor',
-    }
-    
-    # 尝试从文件名末尾提取语言
-    parts = name.split('.')
-    if len(parts) >= 2:
-        last_part = parts[-1].lower()
-        
-        # 🔥 先检查复合语言
-        if last_part in compound_langs:
-            return last_part
-        
-        if last_part in lang_map:
-            return lang_map[last_part]
-    
-    # 尝试匹配中间的语言标识
-    for pattern in compound_langs:
-        if f'.{pattern}.' in name.lower() or f'_{pattern}_' in name.lower():
-            return pattern
+    # 尝试从文件名末尾提取语言（🔥 复合语言优先，已合并在同一张表里）
+    head, dot, last_part = name_lower.rpartition('.')
+    if dot:
+        lang = _TAIL_LANGS.get(last_part)
+        if lang:
+            return lang
     
-    for pattern, lang in lang_map.items():
-        if f'.{pattern}.' in name.lower() or f'_{pattern}_' in name.lower():
+    # 尝试匹配中间的语言标识：".xx." 即按 "." 切分后的中间段，"_xx_" 同理
+    # 切分一次后查集合，代替逐个标识做子串搜索
+    dot_segments = set(name_lower.split('.')[1:-1])
+    underscore_segments = set(name_lower.split('_')[1:-1])
+    for pattern, lang, has_underscore in _MID_LANGS:
+        if pattern in dot_segments:
+            return lang
+        if has_underscore:
+            if f'_{pattern}_' in name_lower:
+                return lang
+        elif pattern in underscore_segments:
             return lang
     
     return 'und'  # 未知
@@ -105,6 +127,18 @@ def reset_scan_progress():
     }
 
 
+def _list_with_delay(service, dirs: List[str], delay: float, skip_first_delay: bool):
+    """
+    逐个列出目录，每次请求前等待 delay 秒（网盘风控）
+    
+    按需产出结果：调用方停止迭代后，剩下的目录不再请求。
+    """
+    for i, dir_path in enumerate(dirs):
+        if i > 0 or not skip_first_delay:
+            time.sleep(delay)
+        yield service.list_directory_batch([dir_path])[0]
+
+
 from backend.agents.state import MediaAgentState
 
 @tool
@@ -166,81 +200,125 @@ def scan_media_files(
         video_files: List[Dict[str, Any]] = []
         subtitle_files: List[Dict[str, Any]] = []
         
-        def scan_directory(dir_path: str, depth: int):
-            """递归扫描目录"""
-            global _scan_progress
-            nonlocal video_files, subtitle_files, scanned_dirs
+        # 同一目录下的文件共用一个目录字符串
+        directory_strings: Dict[str, str] = {}
+        
+        def build_entries(dir_path: str, items: List[Any]) -> List[Tuple[str, Any]]:
+            """把一个目录的列表结果转成条目：("dir", 子目录路径) | ("video"/"subtitle", 文件信息)"""
+            nonlocal scanned_dirs
+            scanned_dirs += 1
+            
+            entries = []
+            for item in items:
+                if item.is_dir:
+                    if recursive:
+                        entries.append(("dir", item.path))
+                    continue
+                
+                file_type = get_file_type(item.name)
+                if file_type != 'video' and file_type != 'subtitle':
+                    continue
+                directory = os.path.dirname(item.path)
+                directory = directory_strings.setdefault(directory, directory)
+                if file_type == 'video':
+                    entries.append(("video", {
+                        "path": item.path,
+                        "name": item.name,
+                        "size": item.size,
+                        "type": "video",
+                        "directory": directory,
+                    }))
+                    _scan_progress["videos"] += 1
+                else:
+                    entries.append(("subtitle", {
+                        "path": item.path,
+                        "name": item.name,
+                        "size": item.size,
+                        "type": "subtitle",
+                        "directory": directory,
+                        # 提取字幕语言
+                        "language": _extract_subtitle_language(item.name),
+                    }))
+                    _scan_progress["subtitles"] += 1
             
-            if depth > max_depth:
-                return
-            # max_files=0 表示不限制
-            total_files = len(video_files) + len(subtitle_files)
-            if max_files > 0 and total_files >= max_files:
-                return
+            # 更新全局进度（用于状态同步）
+            _scan_progress["dirs_scanned"] = scanned_dirs
             
-            try:
+            # 打印扫描进度（每5个目录打印一次）
+            if scanned_dirs % 5 == 0:
+                print(f"📂 已扫描 {scanned_dirs} 个目录 | 视频: {_scan_progress['videos']} | 字幕: {_scan_progress['subtitles']}")
+            return entries
+        
+        # 开始扫描
+        print(f"开始扫描 ({service_type}): {scan_path}")
+        
+        if max_files > 0:
+            # 有数量上限（max_files=0 表示不限制）时在汇总过程中按需逐个列目录：
+            # 结果必须是深度优先顺序的前 max_files 个文件，逐层并行会先取到浅层后面的文件
+            def get_entries(dir_path: str, depth: int) -> Optional[List[Tuple[str, Any]]]:
+                if depth > max_depth:
+                    return None
                 # 应用用户指定的扫描延迟（首个目录不等待）
                 if effective_scan_delay > 0 and scanned_dirs > 0:
-                    import time
                     time.sleep(effective_scan_delay)
+                items = service.list_directory_batch([dir_path])[0]
+                if isinstance(items, Exception):
+                    # 跳过无法访问的目录
+                    print(f"跳过目录 {dir_path}: {items}")
+                    return None
+                return build_entries(dir_path, items)
+        else:
+            # 不限数量时按层并行列目录，再按深度优先顺序汇总，文件顺序与逐个递归扫描一致
+            dir_entries: Dict[str, List[Tuple[str, Any]]] = {}
+            level = [scan_path]
+            depth = 0
+            while level and depth <= max_depth:
+                if effective_scan_delay > 0:
+                    # 设置了扫描延迟（网盘风控）时保持逐个请求，首个目录不等待
+                    listings = _list_with_delay(service, level, effective_scan_delay, skip_first_delay=depth == 0)
+                else:
+                    # 整层目录一次交给存储服务（并行请求）
+                    listings = service.list_directory_batch(level, concurrency=_SCAN_WORKERS)
                 
-                items = service.list_directory(dir_path)
-                scanned_dirs += 1
-                
-                # 更新全局进度（用于状态同步）
-                _scan_progress["dirs_scanned"] = scanned_dirs
-                _scan_progress["videos"] = len(video_files)
-                _scan_progress["subtitles"] = len(subtitle_files)
-                
-                # 打印扫描进度（每5个目录打印一次）
-                if scanned_dirs % 5 == 0:
-                    print(f"📂 已扫描 {scanned_dirs} 个目录 | 视频: {len(video_files)} | 字幕: {len(subtitle_files)}")
+                next_level = []
+                for dir_path, items in zip(level, listings):
+                    if isinstance(items, Exception):
+                        # 跳过无法访问的目录
+                        print(f"跳过目录 {dir_path}: {items}")
+                        continue
+                    entries = build_entries(dir_path, items)
+                    dir_entries[dir_path] = entries
+                    next_level.extend(value for kind, value in entries if kind == "dir")
                 
-                for item in items:
-                    # max_files=0 表示不限制
-                    total_files = len(video_files) + len(subtitle_files)
-                    if max_files > 0 and total_files >= max_files:
-                        return
-                    
-                    if item.is_dir and recursive:
-                        # 递归扫描子目录
-                        scan_directory(item.path, depth + 1)
-                    elif not item.is_dir:
-                        file_type = get_file_type(item.name)
-                        # 获取目录名
-                        directory = os.path.dirname(item.path)
-                        
-                        if file_type == 'video':
-                            video_files.append({
-                                "path": item.path,
-                                "name": item.name,
-                                "size": item.size,
-                                "type": "video",
-                                "directory": directory,
-                            })
-                            # 每发现一个视频更新进度
-                            _scan_progress["videos"] = len(video_files)
-                        elif file_type == 'subtitle':
-                            # 提取字幕语言
-                            language = _extract_subtitle_language(item.name)
-                            subtitle_files.append({
-                                "path": item.path,
-                                "name": item.name,
-                                "size": item.size,
-                                "type": "subtitle",
-                                "directory": directory,
-                                "language": language,
-                            })
-                            _scan_progress["subtitles"] = len(subtitle_files)
-            except Exception as e:
-                # 跳过无法访问的目录
-                print(f"跳过目录 {dir_path}: {e}")
+                level = next_level
+                depth += 1
+            
+            def get_entries(dir_path: str, depth: int) -> Optional[List[Tuple[str, Any]]]:
+                return dir_entries.get(dir_path)
         
-        # 开始扫描
-        print(f"开始扫描 ({service_type}): {scan_path}")
-        scan_directory(scan_path, 0)
+        # 按深度优先顺序汇总（栈中为 (条目迭代器, 所在目录深度)，根目录视为深度 -1 下的子目录）
+        stack = [(iter((("dir", scan_path),)), -1)]
+        while stack:
+            if max_files > 0 and len(video_files) + len(subtitle_files) >= max_files:
+                break
+            entry = next(stack[-1][0], None)
+            if entry is None:
+                stack.pop()
+                continue
+            kind, value = entry
+            if kind == "dir":
+                depth = stack[-1][1] + 1
+                sub_entries = get_entries(value, depth)
+                if sub_entries:
+                    stack.append((iter(sub_entries), depth))
+            elif kind == "video":
+                video_files.append(value)
+            else:
+                subtitle_files.append(value)
         
-        # 标记扫描完成
+        # 标记扫描完成（有数量上限时，最后列出的目录里可能有被截掉的文件，进度以实际结果为准）
+        _scan_progress["videos"] = len(video_files)
+        _scan_progress["subtitles"] = len(subtitle_files)
         _scan_progress["status"] = "connected"
         
         # 合并所有文件
@@ -251,6 +329,7 @@ def scan_media_files(
                 f"📂 在 {scan_path} 中没有找到媒体文件（扫描了 {scanned_dirs} 个目录，使用 {service_type}）\n\n提示：\n• 确保路径正确\n• 检查文件扩展名是否为常见视频格式\n• 尝试指定子目录",
                 {
                     "scanned_files": [],
+                    "scanned_count": 0,
                     "scan_progress": {
                         "videos": 0,
                         "subtitles": 0,
@@ -269,15 +348,12 @@ def scan_media_files(
         video_movies = []
         for f in video_files:
             name = f["name"]
-            tv_pattern = r'^(.+?)\s*[\(\[]?(?:TV\s*)?S?(\d+).*?[\)\]]?\s*\.?\s*(\d+)'
-            movie_pattern = r'^(.+?)\s*[\(\[]?(\d{4})[\)\]]?'
-            
-            tv_match = re.match(tv_pattern, name, re.IGNORECASE)
+            tv_match = _TV_NAME_RE.match(name)
             if tv_match:
                 series_name = tv_match.group(1).strip()
                 video_series[series_name].append(f)
             else:
-                movie_match = re.match(movie_pattern, name)
+                movie_match = _MOVIE_NAME_RE.match(name)
                 if movie_match:
                     video_movies.append({
                         **f,
@@ -292,9 +368,12 @@ def scan_media_files(
             message += "### 📺 剧集系列\n\n"
             message += "| 系列名称 | 视频 | 字幕 | 文件示例 |\n"
             message += "|---------|------|------|----------|\n"
+            # 字幕名只转一次小写，各系列共用
+            subtitle_names_lower = [s["name"].lower() for s in subtitle_files]
             for series_name, episodes in sorted(video_series.items()):
                 # 计算匹配的字幕数量
-                subtitle_count = sum(1 for s in subtitle_files if series_name.lower() in s["name"].lower())
+                series_key = series_name.lower()
+                subtitle_count = sum(1 for sub_name in subtitle_names_lower if series_key in sub_name)
                 first_ep_name = episodes[0]["name"]
                 first_ep = first_ep_name[:35] + '...' if len(first_ep_name) > 35 else first_ep_name
                 message += f"| **{series_name}** | {len(episodes)} | {subtitle_count} | {first_ep} |\n"
@@ -318,6 +397,7 @@ def scan_media_files(
         # 返回通用 JSON 格式
         return make_tool_response(message, {
             "scanned_files": files,
+            "scanned_count": len(files),
             "scan_progress": {
                 "videos": len(video_files),
                 "subtitles": len(subtitle_files),
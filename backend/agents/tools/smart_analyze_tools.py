@@ -25,6 +25,8 @@ import json
 import logging
 from typing import Dict, Any, List, Tuple, Annotated
 from collections import defaultdict
+from functools import lru_cache
+from pydantic import TypeAdapter
 from langchain.tools import tool
 from langgraph.prebuilt import InjectedState
 
@@ -44,13 +46,15 @@ from backend.agents.models import (
     TMDBMapping,
     get_or_build_mapping,
 )
-from backend.agents.models.output import SeasonInfo
+from backend.agents.models.output import SeasonInfo, format_ep_range
 from backend.agents.classifier import (
     classify_file,
     classify_files,
     summarize_results,
     ClassifyResult,
     extract_episode_number as new_extract_episode_number,
+    BASE_NAME_EXT_SUFFIXES,
+    BASE_NAME_LANG_SUFFIXES,
 )
 
 logger = logging.getLogger(__name__)
@@ -87,9 +91,12 @@ def _extract_episode_number(filename: str) -> int:
     return 0
 
 
+@lru_cache(maxsize=8192)
 def _get_base_name(filename: str) -> str:
     """提取文件主名称（去掉语言标识和扩展名）
     
+    同一视频可能被多条 mapping 命中，每次都要取 base_name 查字幕，结果按文件名缓存
+    
     Examples:
         [001].chs.srt → [001]
         [001].mkv → [001]
@@ -98,18 +105,40 @@ def _get_base_name(filename: str) -> str:
         [001].tcjp.ass → [001]
     """
     # 移除扩展名
-    name = re.sub(r'\.(srt|ass|ssa|sub|mkv|mp4|avi|wmv|flv|mov)$', '', filename, flags=re.IGNORECASE)
+    stem, dot, suffix = filename.rpartition('.')
+    if dot and suffix.lower() in BASE_NAME_EXT_SUFFIXES:
+        filename = stem
+        stem, dot, suffix = filename.rpartition('.')
     # 移除语言标识（包括复合语言标识如 scjp, tcjp）
-    name = re.sub(r'\.(chs|cht|chi|eng|jpn|jap|kor|und|sc|tc|scjp|tcjp|chtjp|chsjp)$', '', name, flags=re.IGNORECASE)
-    return name
+    if dot and suffix.lower() in BASE_NAME_LANG_SUFFIXES:
+        filename = stem
+    return filename
 
 
 def _parse_scanned_files(scanned_files_data: List[Dict[str, Any]]) -> List[ScannedFile]:
     """从 State 中解析 scanned_files 数据为 Pydantic 模型
     
-    🔥 使用 Pydantic model_validate 自动验证和转换
+    🔥 数据由 scan_media_files 生成，可信，用 from_trusted 跳过验证
     """
-    return [ScannedFile.model_validate(f) for f in scanned_files_data]
+    return [ScannedFile.from_trusted(f) for f in scanned_files_data]
+
+
+def _split_scanned_files(
+    scanned_files_data: List[Dict[str, Any]]
+) -> Tuple[List[ScannedFile], List[ScannedFile]]:
+    """一次遍历把 scanned_files 分成 (视频, 字幕)
+    
+    只读取每条记录的 type 字段做分流，不属于两者的记录不会构建模型。
+    """
+    video_files: List[ScannedFile] = []
+    subtitle_files: List[ScannedFile] = []
+    buckets = {'video': video_files, 'subtitle': subtitle_files}
+    from_trusted = ScannedFile.from_trusted
+    for f in scanned_files_data:
+        bucket = buckets.get(f.get("type"))
+        if bucket is not None:
+            bucket.append(from_trusted(f))
+    return video_files, subtitle_files
 
 
 def _execute_classification(
@@ -342,12 +371,16 @@ def _execute_classification(
     return classifications, unclassified, matched_count
 
 
+# 整个列表一次交给 pydantic-core 序列化，不必逐个调用 model_dump
+_CLASSIFICATION_LIST_ADAPTER = TypeAdapter(List[Classification])
+
+
 def _classifications_to_list(classifications: Dict[int, Classification]) -> List[Dict[str, Any]]:
     """将 classifications 转换为可序列化的列表格式
     
-    🔥 使用 Pydantic model_dump 自动递归序列化嵌套对象
+    🔥 使用 Pydantic 自动递归序列化嵌套对象（与逐个 model_dump 结果相同）
     """
-    return [cls.model_dump() for cls in classifications.values()]
+    return _CLASSIFICATION_LIST_ADAPTER.dump_python(list(classifications.values()))
 
 
 # ============ 工具函数 ============
@@ -404,12 +437,8 @@ def analyze_and_classify(
         logger.warning("❌ scanned_files_data 为空")
         return make_tool_response("❌ 请先使用 scan_media_files 扫描文件")
     
-    # 解析 scanned_files
-    scanned_files = _parse_scanned_files(scanned_files_data)
-    
-    # 分离视频和字幕文件
-    video_files = [f for f in scanned_files if f.type == 'video']
-    subtitle_files = [f for f in scanned_files if f.type == 'subtitle']
+    # 解析 scanned_files，同时分离视频和字幕文件
+    video_files, subtitle_files = _split_scanned_files(scanned_files_data)
     
     if not video_files:
         return make_tool_response("❌ 扫描结果中没有视频文件")
@@ -465,7 +494,7 @@ def analyze_and_classify(
                 if files:
                     eps = sorted([f.episode for f in files if f.episode > 0])
                     if eps:
-                        output += f"| S{season_num:02d} | {len(files)} | E{eps[0]:02d}-E{eps[-1]:02d} |\n"
+                        output += f"| S{season_num:02d} | {len(files)} | {format_ep_range(eps[0], eps[-1])} |\n"
                     else:
                         output += f"| S{season_num:02d} | {len(files)} | - |\n"
                     total_files += len(files)
@@ -517,7 +546,7 @@ def analyze_and_classify(
                 eps = [f.episode for f in files if f.episode > 0]
                 if eps:
                     all_eps.extend(eps)
-                    season_ep_range = f"E{min(eps):02d}-E{max(eps):02d}"
+                    season_ep_range = format_ep_range(min(eps), max(eps))
                     seasons_info.append(SeasonInfo(
                         season=season_num,
                         episode_count=len(eps),
@@ -525,7 +554,7 @@ def analyze_and_classify(
                     ))
             
             # 兼容旧版的 ep_range
-            ep_range = f"E{min(all_eps):02d}-E{max(all_eps):02d}" if all_eps else "-"
+            ep_range = format_ep_range(min(all_eps), max(all_eps)) if all_eps else "-"
             
             # 使用 Pydantic 模型验证
             item = ClassificationResultItem(
@@ -595,12 +624,8 @@ def analyze_and_classify_v2(
     if not scanned_files_data:
         return make_tool_response("❌ 请先使用 scan_media_files 扫描文件")
     
-    # 解析 scanned_files
-    scanned_files = _parse_scanned_files(scanned_files_data)
-    
-    # 分离视频和字幕文件
-    video_files = [f for f in scanned_files if f.type == 'video']
-    subtitle_files = [f for f in scanned_files if f.type == 'subtitle']
+    # 解析 scanned_files，同时分离视频和字幕文件
+    video_files, subtitle_files = _split_scanned_files(scanned_files_data)
     
     if not video_files:
         return make_tool_response("❌ 扫描结果中没有视频文件")
@@ -741,7 +766,7 @@ def analyze_and_classify_v2(
                 if files:
                     eps = sorted([f.episode for f in files if f.episode > 0])
                     if eps:
-                        output += f"| S{season_num:02d} | {len(files)} | E{eps[0]:02d}-E{eps[-1]:02d} |\n"
+                        output += f"| S{season_num:02d} | {len(files)} | {format_ep_range(eps[0], eps[-1])} |\n"
                     else:
                         output += f"| S{season_num:02d} | {len(files)} | - |\n"
                     total_files += len(files)
@@ -795,14 +820,14 @@ def analyze_and_classify_v2(
                 eps = [f.episode for f in files if f.episode > 0]
                 if eps:
                     all_eps.extend(eps)
-                    season_ep_range = f"E{min(eps):02d}-E{max(eps):02d}"
+                    season_ep_range = format_ep_range(min(eps), max(eps))
                     seasons_info.append(SeasonInfo(
                         season=season_num,
                         episode_count=len(eps),
                         ep_range=season_ep_range
                     ))
             
-            ep_range = f"E{min(all_eps):02d}-E{max(all_eps):02d}" if all_eps else "-"
+            ep_range = format_ep_range(min(all_eps), max(all_eps)) if all_eps else "-"
             
             item = ClassificationResultItem(
                 name=cls.name,
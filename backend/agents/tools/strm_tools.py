@@ -53,8 +53,7 @@ from backend.utils.naming import (
     format_movie_folder,
 )
 from backend.agents.models import (
-    MediaType, SubCategory, determine_subcategory, SubtitleFile,
-    Classification, ClassifiedFile
+    MediaType, determine_subcategory, SubtitleFile, Classification
 )
 from backend.utils.path_utils import get_target_path
 
@@ -156,6 +155,9 @@ def _select_default_subtitle(subtitles: list) -> SubtitleFile:
     """
     if not subtitles:
         return None
+    # 只有一个字幕（最常见）时不必比较优先级
+    if len(subtitles) == 1:
+        return subtitles[0]
     
     return min(subtitles, key=lambda s: _get_language_priority(s.language))
 
@@ -374,49 +376,12 @@ async def _process_subtitles_batch_async(
 
 
 def _parse_classifications(classifications_data: List[Dict[str, Any]]) -> Dict[int, Classification]:
-    """从 State 中解析 classifications 数据为 Pydantic 模型"""
-    result = {}
-    for cls_dict in classifications_data:
-        tmdb_id = cls_dict.get("tmdb_id")
-        if tmdb_id:
-            # 解析 seasons
-            seasons = {}
-            for season_num, files_data in cls_dict.get("seasons", {}).items():
-                season_files = []
-                for f in files_data:
-                    subtitles = [SubtitleFile(**s) for s in f.get("subtitles", [])]
-                    season_files.append(ClassifiedFile(
-                        path=f["path"],
-                        name=f["name"],
-                        episode=f.get("episode", 0),
-                        season=f.get("season", 0),
-                        subtitles=subtitles
-                    ))
-                seasons[int(season_num)] = season_files
-            
-            # 解析 files (for movies)
-            files = []
-            for f in cls_dict.get("files", []):
-                subtitles = [SubtitleFile(**s) for s in f.get("subtitles", [])]
-                files.append(ClassifiedFile(
-                    path=f["path"],
-                    name=f["name"],
-                    episode=f.get("episode", 0),
-                    season=f.get("season", 0),
-                    subtitles=subtitles
-                ))
-            
-            result[tmdb_id] = Classification(
-                tmdb_id=tmdb_id,
-                name=cls_dict.get("name", ""),
-                type=MediaType(cls_dict.get("type", "tv")),
-                year=cls_dict.get("year"),
-                genres=cls_dict.get("genres", []),
-                sub_category=SubCategory(cls_dict.get("sub_category", "default")),
-                seasons=seasons,
-                files=files
-            )
-    return result
+    """从 State 中解析 classifications 数据为 Pydantic 模型（可信数据，跳过验证）"""
+    return {
+        cls_dict["tmdb_id"]: Classification.from_trusted(cls_dict)
+        for cls_dict in classifications_data
+        if cls_dict.get("tmdb_id")
+    }
 
 
 # ============ 工具函数 ============
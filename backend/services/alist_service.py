@@ -18,6 +18,7 @@ import asyncio
 from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
 
 import httpx
@@ -43,6 +44,9 @@ DEFAULT_CACHE_SIZE = 100  # 最大缓存条目数
 # 🔥 HTTP 超时配置
 HTTP_TIMEOUT = 30.0  # 单个请求超时时间（秒）
 
+# 批量操作失败时，汇总日志里列出的样例数
+LOG_FAILURE_SAMPLES = 3
+
 
 class LRUCache:
     """简单的LRU缓存实现"""
@@ -257,6 +261,7 @@ class AlistService(StorageService):
                 data = response.json()
                 code = data.get("code")
                 if code == 200:
+                    self._invalidate_listings(os.path.dirname(full_path))
                     return True
                 else:
                     logger.warning(f"上传文件返回非200状态码 {path}: code={code}, message={data.get('message')}")
@@ -306,6 +311,7 @@ class AlistService(StorageService):
                 data = response.json()
                 code = data.get("code")
                 if code == 200:
+                    self._invalidate_listings(os.path.dirname(full_path))
                     return True
                 else:
                     logger.warning(f"异步上传文件返回非200状态码 {path}: code={code}, message={data.get('message')}")
@@ -347,7 +353,9 @@ class AlistService(StorageService):
             if response.status_code == 200:
                 data = response.json()
                 # code 200 成功，500 可能是目录已存在
-                return data.get("code") in (200, 500)
+                if data.get("code") in (200, 500):
+                    self._invalidate_listings(os.path.dirname(full_path))
+                    return True
             
             return False
         except Exception as e:
@@ -470,6 +478,9 @@ class AlistService(StorageService):
         
         error_count = len(results) - success_count
         
+        # 新建的目录和上传的文件都在 dirs_to_create 里的目录下（含各级父目录）
+        self._invalidate_listings(*dirs_to_create)
+        
         return success_count, error_count, failed_paths
     
     def get_file_url(self, path: str) -> Optional[str]:
@@ -621,6 +632,15 @@ class AlistService(StorageService):
         # 相对路径，拼接到base_path
         return f"{self.base_path}/{path}".replace('//', '/')
     
+    def _invalidate_listings(self, *dir_paths: str):
+        """
+        目录内容被本服务修改后，清掉这些目录的列表缓存（重复扫描命中缓存时不返回过期结果）
+        
+        必须在写操作成功之后调用：提前清除的话，请求期间并发的列表请求会把旧内容重新写回缓存。
+        """
+        for dir_path in dir_paths:
+            self._cache.invalidate(f"list:{dir_path}")
+    
     def _get_headers(self) -> Dict[str, str]:
         """获取请求头"""
         headers = {
@@ -925,6 +945,10 @@ class AlistService(StorageService):
                     headers=self._get_headers(),
                 )
                 
+                # 文件已移入目标目录，即使后面的重命名失败，两边的列表也已变化
+                if response.status_code == 200 and response.json().get("code") == 200:
+                    self._invalidate_listings(src_dir, dst_dir)
+                
                 # 如果目标文件名不同，还需要重命名
                 if src_name != dst_name:
                     new_path = f"{dst_dir}/{src_name}"
@@ -939,12 +963,128 @@ class AlistService(StorageService):
             
             if response.status_code == 200:
                 data = response.json()
-                return data.get("code") == 200
+                if data.get("code") == 200:
+                    # 源/目标目录的列表已变化
+                    self._invalidate_listings(src_dir, dst_dir)
+                    return True
                 
             return False
         except Exception as e:
             raise Exception(f"移动文件失败: {str(e)}")
     
+    def move_files_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        concurrency: int = 8
+    ) -> List[Tuple[bool, Optional[str]]]:
+        """
+        批量移动文件
+        
+        同一 (源目录, 目标目录) 的文件合并成一次 /api/fs/move 请求，
+        文件名不同的再逐个重命名（并行发出）；合并移动失败时该组退回逐个 move_file。
+        
+        Returns:
+            与 pairs 顺序一致的 (是否成功, 错误信息) 列表；成功时错误信息为 None
+        """
+        if len(pairs) <= 1:
+            return super().move_files_batch(pairs, concurrency)
+        
+        if not self._token:
+            if not self._login_sync():
+                raise Exception("登录失败")
+        
+        results: List[Tuple[bool, Optional[str]]] = [(False, None)] * len(pairs)
+        
+        # 按 (源目录, 目标目录) 分组：{(src_dir, dst_dir): [(序号, 源文件名, 目标文件名)]}
+        groups: Dict[Tuple[str, str], List[Tuple[int, str, str]]] = {}
+        for i, (source, destination) in enumerate(pairs):
+            src_dir, src_name = os.path.split(self._full_path(source))
+            dst_dir, dst_name = os.path.split(self._full_path(destination))
+            groups.setdefault((src_dir, dst_dir), []).append((i, src_name, dst_name))
+        
+        client = self._get_sync_client()
+        
+        def rename_one(item: Tuple[int, str, str]) -> Tuple[bool, Optional[str]]:
+            _, path, name = item
+            self._rate_limiter.wait()
+            try:
+                response = client.post(
+                    f"{self.url}/api/fs/rename",
+                    json={"path": path, "name": name},
+                    headers=self._get_headers(),
+                )
+                if response.status_code != 200:
+                    return False, f"重命名 HTTP 错误: status={response.status_code}"
+                data = response.json()
+                if data.get("code") != 200:
+                    return False, f"重命名失败: code={data.get('code')}, message={data.get('message')}"
+                return True, None
+            except Exception as e:
+                return False, f"重命名失败: {e}"
+        
+        # 合并移动失败、退回逐个移动的分组 [(分组, 原因)]，最后汇总成一条日志
+        fallback_groups: List[Tuple[str, str]] = []
+        
+        for (src_dir, dst_dir), items in groups.items():
+            if src_dir != dst_dir:
+                self._rate_limiter.wait()
+                try:
+                    response = client.post(
+                        f"{self.url}/api/fs/move",
+                        json={
+                            "src_dir": src_dir,
+                            "dst_dir": dst_dir,
+                            "names": [src_name for _, src_name, _ in items],
+                        },
+                        headers=self._get_headers(),
+                    )
+                    moved = response.status_code == 200 and response.json().get("code") == 200
+                    reason = "" if moved else f"status={response.status_code}"
+                except Exception as e:
+                    moved = False
+                    reason = str(e)
+                
+                if not moved:
+                    fallback_groups.append((f"{src_dir} -> {dst_dir}", reason))
+                    # 退回逐个移动，单个文件出错不影响同组其他文件
+                    for i, _, _ in items:
+                        results[i] = super().move_files_batch([pairs[i]])[0]
+                    continue
+                
+                self._invalidate_listings(src_dir, dst_dir)
+            
+            # 本组移动完成后立即重命名，避免下一组的同名文件移入同一目录时冲突
+            renames = []  # (序号, 移动后的路径, 目标文件名)
+            for i, src_name, dst_name in items:
+                if src_name == dst_name:
+                    results[i] = (True, None)
+                else:
+                    renames.append((i, f"{dst_dir}/{src_name}", dst_name))
+            
+            if len(renames) > 1:
+                with ThreadPoolExecutor(max_workers=min(concurrency, len(renames))) as executor:
+                    renamed = list(executor.map(rename_one, renames))
+            else:
+                renamed = [rename_one(item) for item in renames]
+            for (i, _, _), result in zip(renames, renamed):
+                results[i] = result
+            if any(ok for ok, _ in renamed):
+                self._invalidate_listings(dst_dir)
+        
+        if fallback_groups:
+            logger.warning(
+                f"批量移动: {len(fallback_groups)} 组合并移动失败，已改为逐个移动，"
+                f"前几组: {fallback_groups[:LOG_FAILURE_SAMPLES]}"
+            )
+        failures = [(pairs[i][0], error) for i, (ok, error) in enumerate(results) if not ok]
+        if failures:
+            logger.warning(
+                f"批量移动: {len(failures)}/{len(pairs)} 个文件失败，"
+                f"前几个: {failures[:LOG_FAILURE_SAMPLES]}"
+            )
+        
+        return results
+    
     def copy_file(self, source: str, destination: str) -> bool:
         """复制文件"""
         if not self._token:
@@ -1009,6 +1149,9 @@ class AlistService(StorageService):
                     logger.warning(f"等待复制完成超时: {copied_path}")
                     # 继续尝试重命名，可能已经完成了
                 
+                # 副本已写入目标目录
+                self._invalidate_listings(dst_dir)
+                
                 # 如果目标文件名不同，需要重命名
                 if src_name != dst_name:
                     new_path = f"{dst_dir}/{src_name}"
@@ -1024,6 +1167,7 @@ class AlistService(StorageService):
                     if response.status_code != 200 or rename_data.get("code") != 200:
                         logger.error(f"重命名文件API返回错误: {rename_data}")
                         return False
+                    self._invalidate_listings(dst_dir)
                     return True
                 return True
             return False
@@ -1055,8 +1199,9 @@ class AlistService(StorageService):
                 headers=self._get_headers(),
             )
             
-            if response.status_code == 200:
-                return response.json().get("code") == 200
+            if response.status_code == 200 and response.json().get("code") == 200:
+                self._invalidate_listings(dir_path)
+                return True
             return False
         except Exception as e:
             raise Exception(f"删除文件失败: {str(e)}")
@@ -1099,6 +1244,7 @@ class AlistService(StorageService):
             if response.status_code == 200:
                 data = response.json()
                 if data.get("code") == 200:
+                    self._invalidate_listings(dst_full)
                     return {name: True for name in names}
             
             return {name: False for name in names}
@@ -1144,6 +1290,7 @@ class AlistService(StorageService):
             if response.status_code == 200:
                 data = response.json()
                 if data.get("code") == 200:
+                    self._invalidate_listings(src_full, dst_full)
                     return {name: True for name in names}
             
             return {name: False for name in names}
@@ -1186,6 +1333,7 @@ class AlistService(StorageService):
             if response.status_code == 200:
                 data = response.json()
                 if data.get("code") == 200:
+                    self._invalidate_listings(full_path)
                     return {name: True for name in names}
             
             return {name: False for name in names}
@@ -1296,6 +1444,8 @@ class AlistService(StorageService):
                 )
                 
                 success = response.status_code == 200 and response.json().get("code") == 200
+                if success:
+                    self._invalidate_listings(os.path.dirname(old_path))
                 results[item["old_path"]] = success
             except Exception as e:
                 print(f"重命名失败 {old_path}: {e}")
@@ -1325,7 +1475,10 @@ class AlistService(StorageService):
             if response.status_code == 200:
                 data = response.json()
                 # code 200 成功，500 可能是目录已存在
-                return data.get("code") in (200, 500)
+                if data.get("code") in (200, 500):
+                    # 父目录的列表已变化
+                    self._invalidate_listings(os.path.dirname(full_path))
+                    return True
                 
             return False
         except Exception as e:
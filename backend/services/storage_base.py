@@ -9,8 +9,9 @@
 import os
 import asyncio
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Any, AsyncGenerator, Tuple
+from typing import Optional, List, Dict, Any, AsyncGenerator, Tuple, Union
 
 
 @dataclass
@@ -90,6 +91,66 @@ class StorageService(ABC):
         """
         pass
     
+    def list_directory_batch(
+        self,
+        paths: List[str],
+        concurrency: int = 8
+    ) -> List[Union[List[FileInfo], Exception]]:
+        """
+        批量列出多个目录（默认实现）
+        
+        逐个调用 list_directory，多个目录用线程池并行发出。
+        后端支持一次请求列出多个目录时应覆盖此方法。
+        
+        Args:
+            paths: 目录路径列表
+            concurrency: 并发数，默认 8
+            
+        Returns:
+            与 paths 顺序一致的结果列表；某个目录失败时对应位置为异常对象，不影响其他目录
+        """
+        def list_one(path: str) -> Union[List[FileInfo], Exception]:
+            try:
+                return self.list_directory(path)
+            except Exception as e:
+                return e
+        
+        if len(paths) <= 1:
+            return [list_one(path) for path in paths]
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(paths))) as executor:
+            return list(executor.map(list_one, paths))
+    
+    def move_files_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        concurrency: int = 8
+    ) -> List[Tuple[bool, Optional[str]]]:
+        """
+        批量移动/重命名文件（默认实现）
+        
+        逐个调用 move_file，多个文件用线程池并行发出。
+        后端支持一次请求移动多个文件时应覆盖此方法。
+        
+        Args:
+            pairs: [(源路径, 目标路径), ...]
+            concurrency: 并发数，默认 8
+            
+        Returns:
+            与 pairs 顺序一致的 (是否成功, 错误信息) 列表；成功时错误信息为 None
+        """
+        def move_one(pair: Tuple[str, str]) -> Tuple[bool, Optional[str]]:
+            try:
+                if self.move_file(*pair) is False:
+                    return False, "移动接口返回失败"
+                return True, None
+            except Exception as e:
+                return False, str(e)
+        
+        if len(pairs) <= 1:
+            return [move_one(pair) for pair in pairs]
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(pairs))) as executor:
+            return list(executor.map(move_one, pairs))
+    
     @abstractmethod
     def create_directory(self, path: str) -> bool:
         """
@@ -4,7 +4,9 @@ TMDB服务
 查询TMDB获取影视信息
 """
 
-from typing import Optional, List, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass
 
 from tmdbv3api import TMDb, Movie, TV, Search, Season
@@ -43,6 +45,9 @@ class TMDBService:
     POSTER_BASE_URL = "https://image.tmdb.org/t/p/w500"
     BACKDROP_BASE_URL = "https://image.tmdb.org/t/p/w1280"
     
+    # 详情缓存容量（LRU）：整理/预览/分类会反复查询同一批 ID
+    DETAILS_CACHE_SIZE = 512
+    
     def __init__(self, api_key: Optional[str] = None, language: str = "zh-CN"):
         """
         初始化TMDB服务
@@ -68,6 +73,27 @@ class TMDBService:
         self.tv_api = TV()
         self.search_api = Search()
         self.season_api = Season()
+        
+        # 详情缓存：{("movie"|"tv", tmdb_id): TMDBMediaInfo}，获取失败不缓存
+        # 工具会在线程池中并发查询，读写加锁
+        self._details_cache: "OrderedDict[Tuple[str, int], TMDBMediaInfo]" = OrderedDict()
+        self._details_lock = threading.Lock()
+    
+    def _get_cached_details(self, key: Tuple[str, int]) -> Optional[TMDBMediaInfo]:
+        """读取详情缓存（命中时标记为最近使用）"""
+        with self._details_lock:
+            info = self._details_cache.get(key)
+            if info is not None:
+                self._details_cache.move_to_end(key)
+            return info
+    
+    def _put_cached_details(self, key: Tuple[str, int], info: TMDBMediaInfo):
+        """写入详情缓存（超出容量淘汰最久未使用的）"""
+        with self._details_lock:
+            self._details_cache[key] = info
+            self._details_cache.move_to_end(key)
+            while len(self._details_cache) > self.DETAILS_CACHE_SIZE:
+                self._details_cache.popitem(last=False)
     
     def search_movie(
         self,
@@ -377,7 +403,7 @@ class TMDBService:
     
     def get_movie_details(self, movie_id: int) -> Optional[TMDBMediaInfo]:
         """
-        获取电影详情
+        获取电影详情（带缓存，返回的对象为共享实例，调用方不要修改）
         
         Args:
             movie_id: TMDB电影ID
@@ -385,16 +411,22 @@ class TMDBService:
         Returns:
             TMDBMediaInfo: 电影信息
         """
+        key = ("movie", movie_id)
+        info = self._get_cached_details(key)
+        if info is not None:
+            return info
         try:
             movie = self.movie_api.details(movie_id)
-            return self._parse_movie(movie)
+            info = self._parse_movie(movie)
         except Exception as e:
             print(f"获取电影详情失败: {e}")
             return None
+        self._put_cached_details(key, info)
+        return info
     
     def get_tv_details(self, tv_id: int) -> Optional[TMDBMediaInfo]:
         """
-        获取电视剧详情
+        获取电视剧详情（带缓存，返回的对象为共享实例，调用方不要修改）
         
         Args:
             tv_id: TMDB电视剧ID
@@ -402,12 +434,18 @@ class TMDBService:
         Returns:
             TMDBMediaInfo: 电视剧信息
         """
+        key = ("tv", tv_id)
+        info = self._get_cached_details(key)
+        if info is not None:
+            return info
         try:
             tv = self.tv_api.details(tv_id)
-            return self._parse_tv(tv)
+            info = self._parse_tv(tv)
         except Exception as e:
             print(f"获取电视剧详情失败: {e}")
             return None
+        self._put_cached_details(key, info)
+        return info
     
     def get_tv_season(self, tv_id: int, season_number: int) -> Optional[Dict[str, Any]]:
         """
@@ -7,6 +7,7 @@ WebDAV服务
 import os
 import time
 import asyncio
+import threading
 from typing import Optional, List, Dict, Any, AsyncGenerator
 from urllib.parse import urljoin, quote
 
@@ -21,6 +22,15 @@ from backend.services.storage_base import StorageService, FileInfo
 MAX_RETRIES = 3
 RETRY_DELAY = 1.0  # 秒
 
+# 列目录只请求解析用到的属性（不用 allprop），服务端不必为每个条目计算其余属性
+_PROPFIND_BODY = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<d:propfind xmlns:d="DAV:"><d:prop>'
+    '<d:resourcetype/><d:getcontentlength/><d:getlastmodified/>'
+    '</d:prop></d:propfind>'
+)
+_PROPFIND_HEADERS = {"Depth": "1", "Content-Type": "application/xml; charset=utf-8"}
+
 
 class WebDAVService(StorageService):
     """标准WebDAV服务"""
@@ -52,6 +62,9 @@ class WebDAVService(StorageService):
         
         self._client: Optional[WebDAVClient] = None
         self._http_client: Optional[httpx.AsyncClient] = None
+        self._sync_client: Optional[httpx.Client] = None
+        # 扫描时多个线程并行列目录，懒创建 _sync_client 要加锁，避免重复创建、泄漏连接池
+        self._sync_client_lock = threading.Lock()
     
     @property
     def client(self) -> WebDAVClient:
@@ -83,11 +96,28 @@ class WebDAVService(StorageService):
             )
         return self._http_client
     
+    def _get_sync_client(self) -> httpx.Client:
+        """获取同步HTTP客户端（列目录复用连接，不必每个目录重新握手）"""
+        client = self._sync_client
+        if client is None:
+            with self._sync_client_lock:
+                client = self._sync_client
+                if client is None:
+                    client = self._sync_client = httpx.Client(
+                        auth=(self.username, self.password),
+                        timeout=30.0,
+                        follow_redirects=True,
+                    )
+        return client
+    
     async def close(self):
         """关闭客户端连接"""
         if self._http_client:
             await self._http_client.aclose()
             self._http_client = None
+        if self._sync_client:
+            self._sync_client.close()
+            self._sync_client = None
     
     def _full_path(self, path: str) -> str:
         """获取完整路径"""
@@ -141,8 +171,6 @@ class WebDAVService(StorageService):
         Returns:
             List[FileInfo]: 文件信息列表
         """
-        import httpx
-        
         full_path = self._full_path(path)
         
         # 构建WebDAV URL
@@ -156,25 +184,21 @@ class WebDAVService(StorageService):
         last_error = None
         for attempt in range(MAX_RETRIES):
             try:
-                # 使用同步HTTP请求
-                with httpx.Client(
-                    auth=(self.username, self.password),
-                    timeout=30.0,
-                    follow_redirects=True,
-                ) as client:
-                    response = client.request(
-                        "PROPFIND",
-                        webdav_url,
-                        headers={"Depth": "1"},
-                    )
-                    
-                    if response.status_code in (200, 207):
-                        return self._parse_propfind_response(response.text, full_path)
-                    elif response.status_code == 404:
-                        # 404可能是临时问题，重试
-                        last_error = f"HTTP 404: Not Found"
-                    else:
-                        raise Exception(f"HTTP {response.status_code}: {response.text[:200]}")
+                # 使用同步HTTP请求（复用连接池）
+                response = self._get_sync_client().request(
+                    "PROPFIND",
+                    webdav_url,
+                    headers=_PROPFIND_HEADERS,
+                    content=_PROPFIND_BODY,
+                )
+                
+                if response.status_code in (200, 207):
+                    return self._parse_propfind_response(response.text, full_path)
+                elif response.status_code == 404:
+                    # 404可能是临时问题，重试
+                    last_error = f"HTTP 404: Not Found"
+                else:
+                    raise Exception(f"HTTP {response.status_code}: {response.text[:200]}")
                     
             except Exception as e:
                 last_error = str(e)
@@ -206,7 +230,8 @@ class WebDAVService(StorageService):
                 response = await self.http_client.request(
                     "PROPFIND",
                     webdav_url,
-                    headers={"Depth": "1"},
+                    headers=_PROPFIND_HEADERS,
+                    content=_PROPFIND_BODY,
                 )
                 
                 if response.status_code in (200, 207):
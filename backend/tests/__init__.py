@@ -0,0 +1,3 @@
+"""
+后端单元测试
+"""
@@ -0,0 +1,93 @@
+"""
+_emit_state_if_changed 去重测试
+"""
+
+import asyncio
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langgraph")
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from backend.agents import media_agent
+
+
+@pytest.fixture
+def emitted(monkeypatch):
+    """替换 copilotkit_emit_state，记录每次实际发送的状态"""
+    calls = []
+    
+    async def fake_emit_state(config, state):
+        calls.append(state)
+    
+    copilotkit = types.ModuleType("copilotkit")
+    langgraph = types.ModuleType("copilotkit.langgraph")
+    langgraph.copilotkit_emit_state = fake_emit_state
+    copilotkit.langgraph = langgraph
+    monkeypatch.setitem(sys.modules, "copilotkit", copilotkit)
+    monkeypatch.setitem(sys.modules, "copilotkit.langgraph", langgraph)
+    monkeypatch.setattr(media_agent, "_last_emitted_digest", type(media_agent._last_emitted_digest)())
+    return calls
+
+
+def _config(thread_id: str = "t1") -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _state(**extra) -> dict:
+    state = {
+        "messages": [
+            HumanMessage(content="扫描 /anime", id="m1"),
+            AIMessage(
+                content="",
+                id="m2",
+                tool_calls=[{"name": "scan_media_files", "args": {"path": "/anime"}, "id": "c1"}],
+            ),
+            ToolMessage(content="扫描完成", tool_call_id="c1", id="m3"),
+        ],
+        "current_tool": {"name": "", "status": "idle", "description": ""},
+        "scan_progress": {"current": 0, "total": 0, "status": "connected"},
+    }
+    state.update(extra)
+    return state
+
+
+def test_state_with_messages_has_digest():
+    assert media_agent._state_digest(_state()) is not None
+
+
+def test_repeated_identical_emit_is_skipped(emitted):
+    asyncio.run(media_agent._emit_state_if_changed(_config(), _state()))
+    asyncio.run(media_agent._emit_state_if_changed(_config(), _state()))
+    
+    assert len(emitted) == 1
+
+
+def test_key_order_does_not_matter(emitted):
+    state = _state()
+    reordered = dict(reversed(list(state.items())))
+    
+    asyncio.run(media_agent._emit_state_if_changed(_config(), state))
+    asyncio.run(media_agent._emit_state_if_changed(_config(), reordered))
+    
+    assert len(emitted) == 1
+
+
+def test_changed_state_is_emitted(emitted):
+    asyncio.run(media_agent._emit_state_if_changed(_config(), _state()))
+    changed = _state()
+    changed["messages"].append(AIMessage(content="共 12 个视频", id="m4"))
+    asyncio.run(media_agent._emit_state_if_changed(_config(), changed))
+    
+    assert len(emitted) == 2
+
+
+def test_threads_are_tracked_separately(emitted):
+    asyncio.run(media_agent._emit_state_if_changed(_config("t1"), _state()))
+    asyncio.run(media_agent._emit_state_if_changed(_config("t2"), _state()))
+    
+    assert len(emitted) == 2
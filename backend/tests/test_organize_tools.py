@@ -0,0 +1,41 @@
+"""
+organize_tools 字幕任务分组测试
+"""
+
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langgraph")
+
+from backend.agents.tools.organize_tools import _group_subtitle_jobs
+
+
+SEASON = "/media/剧集/动漫/SeriesA (2020)/Season 01"
+
+
+def _job(video: str, subs):
+    return (video, f"{SEASON}/{video.rsplit('/', 1)[-1]}", None, [(src, f"{SEASON}/{dst}") for src, dst in subs])
+
+
+def test_same_subtitle_name_from_different_folders_shares_a_group():
+    sc = _job("/dl/01.mkv", [("/dl/SC/01.ass", "SeriesA.S01.E01.chs.ass")])
+    tc = _job("/dl/01v2.mkv", [("/dl/TC/01.ass", "SeriesA.S01.E01.cht.ass")])
+    other = _job("/dl/02.mkv", [("/dl/SC/02.ass", "SeriesA.S01.E02.chs.ass")])
+    
+    groups = _group_subtitle_jobs([sc, other, tc])
+    
+    assert sorted(map(len, groups)) == [1, 2]
+    assert [sc, tc] in groups
+
+
+def test_default_copy_counts_as_a_transfer():
+    first = ("/dl/01.mkv", f"{SEASON}/e01.mkv", ("/dl/SC/01.ass", f"{SEASON}/e01.ass"), [])
+    second = _job("/dl/01v2.mkv", [("/dl/TC/01.ass", "e01.cht.ass")])
+    
+    assert _group_subtitle_jobs([first, second]) == [[first, second]]
+
+
+def test_distinct_subtitles_run_in_separate_groups():
+    jobs = [_job(f"/dl/{i:02d}.mkv", [(f"/dl/{i:02d}.ass", f"e{i:02d}.chs.ass")]) for i in range(1, 4)]
+    
+    assert _group_subtitle_jobs(jobs) == [[job] for job in jobs]
@@ -0,0 +1,132 @@
+"""
+scan_media_files 测试（使用内存中的假存储服务）
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langgraph")
+
+from backend.agents.tools import scan_tools
+from backend.services.storage_base import FileInfo, StorageService
+
+
+class FakeStorage:
+    """按 {目录: [FileInfo]} 返回列表的存储服务，不存在的目录抛异常"""
+    
+    list_directory_batch = StorageService.list_directory_batch
+    
+    def __init__(self, tree):
+        self.tree = tree
+        self.listed = []
+    
+    def list_directory(self, path):
+        self.listed.append(path)
+        if path not in self.tree:
+            raise FileNotFoundError(path)
+        return self.tree[path]
+
+
+def _dir(path):
+    return FileInfo(path=path, name=path.rsplit("/", 1)[-1], is_dir=True)
+
+
+def _file(path):
+    return FileInfo(path=path, name=path.rsplit("/", 1)[-1], is_dir=False, size=1)
+
+
+def _scan(monkeypatch, tree, **kwargs):
+    service = FakeStorage(tree)
+    monkeypatch.setattr(scan_tools, "get_storage_service", lambda state: service)
+    state = {"storage_config": {"scan_path": "/root", "type": "fake"}, "user_config": {}}
+    result = json.loads(scan_tools.scan_media_files.func(state=state, **kwargs))
+    return [f["path"] for f in result["state_update"]["scanned_files"]], service
+
+
+def test_max_files_keeps_depth_first_prefix(monkeypatch):
+    tree = {
+        "/root": [_dir("/root/dirA"), _file("/root/f1.mkv")],
+        "/root/dirA": [_file("/root/dirA/a1.mkv"), _file("/root/dirA/a2.mkv")],
+    }
+    
+    paths, _ = _scan(monkeypatch, tree, max_files=2)
+    
+    assert paths == ["/root/dirA/a1.mkv", "/root/dirA/a2.mkv"]
+
+
+def test_max_files_does_not_list_directories_past_the_limit(monkeypatch):
+    tree = {
+        "/root": [_dir("/root/dirA"), _dir("/root/dirB")],
+        "/root/dirA": [_file("/root/dirA/a1.mkv")],
+        "/root/dirB": [_file("/root/dirB/b1.mkv")],
+    }
+    
+    paths, service = _scan(monkeypatch, tree, max_files=1)
+    
+    assert paths == ["/root/dirA/a1.mkv"]
+    assert "/root/dirB" not in service.listed
+
+
+def _recursive_scan(tree, path, recursive=True, max_files=0, max_depth=10):
+    """参照实现：逐个目录递归扫描，返回视频在前、字幕在后的路径列表"""
+    videos, subtitles = [], []
+    
+    def walk(dir_path, depth):
+        if depth > max_depth or dir_path not in tree:
+            return
+        for item in tree[dir_path]:
+            if max_files > 0 and len(videos) + len(subtitles) >= max_files:
+                return
+            if item.is_dir:
+                if recursive:
+                    walk(item.path, depth + 1)
+            elif item.name.endswith(".mkv"):
+                videos.append(item.path)
+            elif item.name.endswith(".ass"):
+                subtitles.append(item.path)
+    
+    walk(path, 0)
+    return videos + subtitles
+
+
+def _random_tree(rng):
+    tree = {}
+    
+    def build(path, depth):
+        items = []
+        for i in range(rng.randint(0, 5)):
+            if depth < 4 and rng.random() < 0.35:
+                child = f"{path}/d{i}"
+                items.append(_dir(child))
+                # 少数子目录无法访问（列表时抛异常）
+                if rng.random() < 0.9:
+                    build(child, depth + 1)
+            else:
+                ext = rng.choice(["mkv", "ass", "txt"])
+                items.append(_file(f"{path}/f{i}.{ext}"))
+        tree[path] = items
+    
+    build("/root", 0)
+    return tree
+
+
+@pytest.mark.parametrize("seed", range(40))
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"max_files": 1},
+    {"max_files": 3},
+    {"max_files": 7},
+    {"max_depth": 1},
+    {"max_files": 4, "max_depth": 2},
+    {"recursive": False},
+])
+def test_matches_recursive_scan(monkeypatch, seed, kwargs):
+    import random
+    
+    tree = _random_tree(random.Random(seed))
+    
+    paths, _ = _scan(monkeypatch, tree, **kwargs)
+    
+    assert paths == _recursive_scan(tree, "/root", **kwargs)